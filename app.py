@@ -1,18 +1,27 @@
+import atexit
+import base64
 import datetime
+import hashlib
 import json
 import os
+import re
 import uuid
 import sys
+import threading
 import time
 import openai
 import requests
+from concurrent.futures import ThreadPoolExecutor
+
 from bson.objectid import ObjectId
-from flask import (Flask, jsonify, render_template, request, url_for, redirect,
-                   flash)
+from flask import (Flask, Response, jsonify, render_template, request, url_for,
+                   redirect, flash, stream_with_context)
+from flask.json.provider import DefaultJSONProvider
 from flask_login import (LoginManager, UserMixin, login_user, logout_user,
                          login_required, current_user)
-from pymongo import MongoClient, TEXT
+from pymongo import MongoClient, TEXT, UpdateOne
 from pymongo.errors import OperationFailure
+from pymongo.write_concern import WriteConcern
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 
@@ -20,15 +29,85 @@ from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 load_dotenv()
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, which (de)serializes several times
+    faster than the stdlib encoder. ObjectId and datetime fall back to str()."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def json_loads(payload):
+    """Parses JSON with orjson when available; used for AI helper responses."""
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+class FallbackJSONProvider(DefaultJSONProvider):
+    """Stdlib-based provider that still serializes ObjectId (and anything else
+    unknown) via str(), matching the orjson provider's behavior."""
+
+    def default(self, o):
+        try:
+            return DefaultJSONProvider.default(o)
+        except TypeError:
+            return str(o)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+else:
+    print("WARNING: orjson not installed; falling back to the stdlib JSON encoder.")
+    app.json = FallbackJSONProvider(app)
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'a-very-secret-key-for-dev')
 app.config['UPLOAD_FOLDER'] = 'uploads'
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Note content is long-form text, so list/search responses compress 2-5x;
+# brotli is preferred when the brotli package is present, gzip otherwise.
+if Compress is not None:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    Compress(app)
+else:
+    print("WARNING: flask-compress not installed; responses will be sent uncompressed.")
+
 
 # --- Configuration ---
 MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/?retryWrites=true&w=majority&directConnection=true')
-client = MongoClient(MONGO_URI)
+# One client per worker with an explicitly sized pool; minPoolSize keeps warm
+# connections ready and the compressors cut network bytes on the text-heavy
+# note payloads (zstd/snappy apply only if their packages are installed,
+# zlib always works). MongoClient must stay at module scope — never construct
+# one per request; each instance owns its own pool and monitor threads.
+client = MongoClient(
+    MONGO_URI,
+    maxPoolSize=50,
+    minPoolSize=5,
+    maxIdleTimeMS=60000,
+    waitQueueTimeoutMS=2500,
+    serverSelectionTimeoutMS=3000,
+    connectTimeoutMS=5000,
+    socketTimeoutMS=20000,
+    retryReads=True,
+    retryWrites=True,
+    compressors='zstd,snappy,zlib',
+    appname='story_weaver',
+)
 db = client['story_weaver_auth']
 users_collection = db['users']
 projects_collection = db['projects']
@@ -36,6 +115,21 @@ notes_collection = db['notes']
 invited_users_collection = db['invited_users']
 shared_invites_collection = db['shared_invites']
 quizzes_collection = db['quizzes']
+ai_cache_collection = db['ai_response_cache']
+tag_counts_collection = db['tag_counts']
+# Note writes are the hottest endpoint and tolerate w=1: losing one on a
+# primary failover window is acceptable, while waiting on majority ack adds a
+# replication round-trip to every submission. Accounts/projects keep the URI's
+# w=majority.
+notes_fast_writes = notes_collection.with_options(write_concern=WriteConcern(w=1, j=False))
+
+# Warm up the pool at startup so the first real query doesn't pay the
+# connection handshake and auth round-trips.
+try:
+    client.admin.command('ping')
+except Exception as e:
+    print(f"WARNING: MongoDB warmup ping failed: {e}")
+
 openai.api_key = os.environ.get('OPENAI_API_KEY')
 if not openai.api_key:
     print("WARNING: OPENAI_API_KEY environment variable not set. AI features will fail.")
@@ -43,6 +137,7 @@ if not openai.api_key:
 # --- NEW: Atlas Vector Search Configuration ---
 ATLAS_LUCENE_INDEX_NAME = "notes_text_search"
 ATLAS_VECTOR_SEARCH_INDEX_NAME = os.environ.get('ATLAS_VECTOR_SEARCH_INDEX_NAME', 'default_vector_index')
+AI_CACHE_VECTOR_INDEX_NAME = "ai_cache_vector_index"
 IS_ATLAS = "mongodb+srv" in MONGO_URI
 if IS_ATLAS:
     print("✅ Atlas environment detected. Vector Search features will be enabled.")
@@ -58,27 +153,82 @@ NOTIFICATION_EMAIL_FROM = os.environ.get('NOTIFICATION_EMAIL_FROM', 'app-alerts@
 if not MAILGUN_API_KEY or not MAILGUN_DOMAIN:
     print("WARNING: MAILGUN_API_KEY or MAILGUN_DOMAIN environment variable not set. Email notifications will fail.")
 
+# Reused across notifications so keep-alive skips the TCP+TLS handshake
+# (~100-300ms) on every send after the first. The adapter is sized for the
+# notify pool so concurrent sends never block on a free connection.
+MAILGUN_SESSION = requests.Session()
+MAILGUN_SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=50))
+
 # --- Database Indexes for Scale ---
-notes_collection.create_index([("content", TEXT)])
-notes_collection.create_index([("tags", 1)])
-notes_collection.create_index([("project_id", 1), ("user_id", 1), ("timestamp", -1)])
-projects_collection.create_index([("user_id", 1), ("created_at", -1)])
-quizzes_collection.create_index([("share_token", 1)], unique=True, sparse=True)
-quizzes_collection.create_index([("project_id", 1), ("created_at", -1)])
+def ensure_indexes():
+    """Creates (or confirms) every index the app relies on.
+
+    Runs at import by default so local dev just works; set
+    AUTO_CREATE_INDEXES=0 in production and run `flask init-indexes` once
+    per deploy instead, so N gunicorn workers don't each replay the same
+    createIndexes round-trips on boot."""
+    notes_collection.create_index([("content", TEXT)])
+    # Tag filters always carry project_id/user_id, so the compound multikey
+    # index serves them directly; the old single-field tags index only added
+    # write amplification.
+    notes_collection.create_index([("project_id", 1), ("user_id", 1), ("tags", 1), ("timestamp", -1)])
+    try:
+        notes_collection.drop_index("tags_1")
+    except OperationFailure:
+        pass  # already dropped (or never existed on a fresh database)
+    notes_collection.create_index([("project_id", 1), ("user_id", 1), ("timestamp", -1), ("_id", -1)])
+    notes_collection.create_index([("project_id", 1), ("user_id", 1), ("contributor_label", 1), ("timestamp", -1), ("_id", -1)])
+    projects_collection.create_index([("user_id", 1), ("created_at", -1)])
+    quizzes_collection.create_index([("share_token", 1)], unique=True, sparse=True)
+    # Invite links are resolved by token on every guest page load; new
+    # documents use the token as _id, but legacy documents still need this
+    # lookup index. project_id rides along so add_note's scoped lookup
+    # {token, project_id} resolves entirely in the B-tree.
+    invited_users_collection.create_index([("token", 1), ("project_id", 1)], unique=True, sparse=True)
+    try:
+        invited_users_collection.drop_index("token_1")
+    except OperationFailure:
+        pass  # superseded by the compound index (or never created)
+    invited_users_collection.create_index([("project_id", 1), ("label", 1)])
+    shared_invites_collection.create_index([("token", 1), ("project_id", 1)], unique=True, sparse=True)
+    try:
+        shared_invites_collection.drop_index("token_1")
+    except OperationFailure:
+        pass  # superseded by the compound index (or never created)
+    quizzes_collection.create_index([("project_id", 1), ("created_at", -1)])
+    ai_cache_collection.create_index([("created_at", 1)], expireAfterSeconds=30 * 24 * 3600)
+    tag_counts_collection.create_index([("project_id", 1), ("tag", 1)])
+
+
+@app.cli.command('init-indexes')
+def init_indexes_command():
+    """One-shot index sync: `flask init-indexes`."""
+    ensure_indexes()
+    print("✅ Indexes ensured.")
+
+
+if os.environ.get('AUTO_CREATE_INDEXES', '1') != '0':
+    ensure_indexes()
 
 def wait_for_index(coll, index_name: str, timeout: int = 300):
-    """Poll search indexes until the specified index is ready."""
+    """Poll search indexes until the specified index is ready.
+
+    Readiness is bimodal — small indexes flip in seconds, rebuilds take
+    minutes — so poll quickly at first and back off exponentially instead of
+    hammering listSearchIndexes on a fixed interval."""
     print(f"⏳ Waiting for index '{index_name}' to be ready...")
     start_time = time.time()
+    delay = 1.0
     while time.time() - start_time < timeout:
         try:
             indexes = list(coll.list_search_indexes(name=index_name))
             if indexes and (indexes[0].get('status') == 'READY' or indexes[0].get('queryable') == True):
                 print(f"✅ Index '{index_name}' is ready.")
                 return True
-            time.sleep(5)
         except OperationFailure:
-            time.sleep(5)
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 10.0)
     raise TimeoutError(f"Index '{index_name}' did not become ready in {timeout}s.")
 
 
@@ -139,6 +289,25 @@ def ensure_atlas_indexes():
         else:
             print(f"✅ Atlas Lucene Search index '{ATLAS_LUCENE_INDEX_NAME}' already exists and is assumed to be ready.")
 
+        existing_cache_indexes = {index['name'] for index in ai_cache_collection.list_search_indexes()}
+        if AI_CACHE_VECTOR_INDEX_NAME not in existing_cache_indexes:
+            print(f"⚠️ Atlas Search index '{AI_CACHE_VECTOR_INDEX_NAME}' not found. Attempting to create it...")
+            cache_index_definition = {
+                "name": AI_CACHE_VECTOR_INDEX_NAME,
+                "definition": {
+                    "mappings": {
+                        "dynamic": False,
+                        "fields": {
+                            "embedding": {"type": "knnVector", "similarity": "cosine", "dimensions": 1536}
+                        }
+                    }
+                }
+            }
+            ai_cache_collection.create_search_index(model=cache_index_definition)
+            print(f"✅ Successfully initiated creation of AI cache vector index '{AI_CACHE_VECTOR_INDEX_NAME}'.")
+        else:
+            print(f"✅ AI cache vector index '{AI_CACHE_VECTOR_INDEX_NAME}' already exists and is assumed to be ready.")
+
     except Exception as e:
         print(f"❌ An error occurred during index checks/creation: {e}")
 
@@ -152,17 +321,42 @@ login_manager.login_view = 'login'
 class User(UserMixin):
     def __init__(self, user_data):
         self.id = str(user_data['_id'])
+        # The already-parsed ObjectId from the DB, so routes don't re-parse
+        # the hex string via current_user.oid on every query.
+        self.oid = user_data['_id']
         self.email = user_data['email']
         self.password_hash = user_data['password']
 
     @staticmethod
     def get(user_id):
-        user_data = users_collection.find_one({'_id': ObjectId(user_id)})
+        user_data = _fetch_user(str(user_id))
         if user_data:
             return User(user_data)
         return None
 
 
+USER_CACHE_TTL_SECONDS = 60
+_user_cache = {}
+
+
+def _fetch_user(user_id_str):
+    """load_user re-queries users on every authenticated request even though
+    accounts never change mid-session (there is no profile editing). A short
+    TTL keeps one lookup per user per minute instead of one per request."""
+    now = time.time()
+    cached = _user_cache.get(user_id_str)
+    if cached and cached[0] > now:
+        return cached[1]
+    try:
+        user_data = users_collection.find_one({'_id': ObjectId(user_id_str)})
+    except Exception:
+        return None
+    if len(_user_cache) > 4096:
+        _user_cache.clear()
+    _user_cache[user_id_str] = (now + USER_CACHE_TTL_SECONDS, user_data)
+    return user_data
+
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.get(user_id)
@@ -170,6 +364,42 @@ def load_user(user_id):
 
 # --- Constants ---
 NOTES_PER_PAGE = 10
+NOTES_SORT = [("timestamp", -1), ("_id", -1)]
+# Only the fields the note list actually renders; keeps content_embedding and
+# other large fields off the wire on the hot read paths.
+NOTE_LIST_FIELDS = {
+    'content': 1, 'tags': 1, 'contributor_label': 1, 'timestamp': 1,
+    'project_id': 1, 'user_id': 1, 'answered_prompt': 1, 'formatted_timestamp': 1
+}
+SEARCH_COUNT_LIMIT = 1000
+TEXT_SEARCH_MAX_RESULTS = 400
+# Constant pipeline stages shared across requests; nothing may mutate these.
+SEARCH_HIT_PROJECTION = {
+    '$project': {
+        '_id': 1,
+        'search_score': {'$meta': 'searchScore'},
+        'paginationToken': {'$meta': 'searchSequenceToken'}
+    }
+}
+ANN_SCORE_PROJECTION = {'$project': {'score': {'$meta': 'vectorSearchScore'}}}
+SEARCH_COUNT_TTL_SECONDS = 60
+_search_count_cache = {}
+
+
+def cached_note_count(cache_key, count_fn):
+    """Returns a recently cached result count, recomputing at most once per TTL.
+
+    Counting matched documents walks every matching index key, so paging through
+    the same result set should not pay for a fresh count on every request."""
+    now = time.time()
+    cached = _search_count_cache.get(cache_key)
+    if cached and cached[0] > now:
+        return cached[1]
+    total = count_fn()
+    if len(_search_count_cache) > 1024:
+        _search_count_cache.clear()
+    _search_count_cache[cache_key] = (now + SEARCH_COUNT_TTL_SECONDS, total)
+    return total
 STORY_TONES = ["Nostalgic & Warm", "Comedic Monologue", "Hardboiled Detective", "Documentary Narrator", "Epic Saga",
                "Formal & Academic"]
 STORY_FORMATS = ["Short Story (3-5 paragraphs)", "Executive Summary (1 paragraph)", "Key Plot Points (Bulleted List)"]
@@ -177,17 +407,103 @@ SONG_GENRES = ["Pop", "Folk", "Indie Rock", "Hip-Hop", "Electronic", "Country",
 SONG_MOODS = ["Upbeat & Hopeful", "Melancholic & Reflective", "Energetic & Anthemic", "Intimate & Acoustic", "Dark & Brooding"]
 
 
+# ----------------------------------------------------------------------
+# --- Pagination Helper Functions ---
+# ----------------------------------------------------------------------
+def encode_note_cursor(timestamp, note_id):
+    """Packs the last-seen (timestamp, _id) pair into an opaque pagination token."""
+    raw = f"{timestamp.isoformat()}|{note_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_note_cursor(token):
+    """Decodes a pagination token back into a (timestamp, ObjectId) pair, or None if invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(token.encode()).decode()
+        ts_part, id_part = raw.split('|', 1)
+        return datetime.datetime.fromisoformat(ts_part), ObjectId(id_part)
+    except Exception:
+        return None
+
+
+def note_cursor_range_filter(last_ts, last_id):
+    """Builds the range filter selecting notes strictly after the cursor position
+    in (timestamp desc, _id desc) order, so deep pages stay index range scans."""
+    return {'$or': [
+        {'timestamp': {'$lt': last_ts}},
+        {'timestamp': last_ts, '_id': {'$lt': last_id}}
+    ]}
+
+
+def utcnow():
+    """datetime.datetime.utcnow is deprecated (and slightly slower); keep one
+    replacement so every timestamp in the app comes from the same source."""
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+_TAG_SPLIT_RE = re.compile(r'\s*,\s*')
+
+
+def parse_tags(tags_string):
+    """Normalizes a comma-separated tag string into sorted, deduplicated,
+    lowercase tags in a single pass.
+
+    Centralized so future validation (length caps, unicode normalization)
+    lands in one place."""
+    if not tags_string:
+        return []
+    return sorted({tag.lower() for tag in _TAG_SPLIT_RE.split(tags_string.strip()) if tag})
+
+
+def bump_tag_counts(project_id_obj, added_tags=(), removed_tags=()):
+    """Incrementally maintains the per-project tag summary behind /api/get-tags.
+
+    Tags only change on writes, so the write path pays a small upsert batch and
+    the read path becomes an index scan over distinct tags instead of an
+    $unwind + $group over every note."""
+    deltas = {}
+    for tag in added_tags:
+        deltas[tag] = deltas.get(tag, 0) + 1
+    for tag in removed_tags:
+        deltas[tag] = deltas.get(tag, 0) - 1
+    ops = [UpdateOne({'_id': f"{project_id_obj}:{tag}"},
+                     {'$inc': {'count': delta},
+                      '$set': {'project_id': project_id_obj, 'tag': tag}},
+                     upsert=True)
+           for tag, delta in deltas.items() if delta]
+    if not ops:
+        return
+    try:
+        tag_counts_collection.bulk_write(ops, ordered=False)
+    except Exception as e:
+        print(f"WARNING: failed to update tag counts: {e}")
+
+
+_MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+                'August', 'September', 'October', 'November', 'December')
+
+
+def format_note_timestamp(timestamp):
+    """Human-readable timestamp shown in the note feed.
+
+    Stored on the document at write time and only recomputed for documents
+    that predate the precomputed field. Built with f-strings instead of
+    strftime: cheaper per call and avoids the glibc-only %-I directive."""
+    hour12 = ((timestamp.hour - 1) % 12) + 1
+    meridiem = 'AM' if timestamp.hour < 12 else 'PM'
+    return (f"{_MONTH_NAMES[timestamp.month - 1]} {timestamp.day:02d}, "
+            f"{timestamp.year}, {hour12}:{timestamp.minute:02d} {meridiem}")
+
+
 # ----------------------------------------------------------------------
 # --- Email Helper Function ---
 # ----------------------------------------------------------------------
-def send_notification_email(contributor_label, project_name, content_snippet, token, project_owner_email, is_shared=False):
+def send_notification_email(contributor_label, project_name, content_snippet, invite_url, project_owner_email):
     if not MAILGUN_API_KEY or not MAILGUN_DOMAIN:
         print("Notification skipped: Mailgun API key or domain is missing.")
         return
 
     recipient_email = NOTIFICATION_EMAIL_TO_OVERRIDE or project_owner_email
-    
-    invite_url = url_for('invite_note', token=token, _external=True) if not is_shared else url_for('shared_invite_page', token=token, _external=True)
 
     email_subject = f"🔔 New Note in '{project_name}' from {contributor_label}"
     email_body_html = f"""
@@ -207,23 +523,101 @@ def send_notification_email(contributor_label, project_name, content_snippet, to
         </p>
     </body></html>
     """
+    # The sender already runs off-request on the notify pool, so retrying with
+    # backoff here costs the user nothing and survives transient Mailgun blips.
+    for attempt in range(3):
+        try:
+            response = MAILGUN_SESSION.post(
+                f"https://api.mailgun.net/v3/{MAILGUN_DOMAIN}/messages",
+                auth=("api", MAILGUN_API_KEY),
+                data={"from": f"Story Weaver Alert <{NOTIFICATION_EMAIL_FROM}>",
+                      "to": recipient_email,
+                      "subject": email_subject,
+                      "html": email_body_html},
+                timeout=10)
+            response.raise_for_status()
+            print(f"✅ Notification email sent. Status: {response.status_code}")
+            return
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Mailgun Error (attempt {attempt + 1}/3): {e}")
+            time.sleep(2 ** attempt)
+
+
+def notify_project_owner(owner_id, contributor_label, project_name, content_snippet, invite_url):
+    """Resolves the owner's email and sends the notification.
+
+    Runs on the notify pool so the submitting request never waits on the
+    owner lookup or the Mailgun round-trip."""
     try:
-        response = requests.post(
-            f"https://api.mailgun.net/v3/{MAILGUN_DOMAIN}/messages",
-            auth=("api", MAILGUN_API_KEY),
-            data={"from": f"Story Weaver Alert <{NOTIFICATION_EMAIL_FROM}>",
-                  "to": recipient_email,
-                  "subject": email_subject,
-                  "html": email_body_html})
-        response.raise_for_status()
-        print(f"✅ Notification email sent. Status: {response.status_code}")
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Mailgun Error: {e}")
+        project_owner = _fetch_user(str(owner_id))
+        if project_owner:
+            send_notification_email(contributor_label, project_name, content_snippet,
+                                    invite_url, project_owner['email'])
+    except Exception as e:
+        print(f"❌ Background notification failed: {e}")
 
 
 # ----------------------------------------------------------------------
 # --- AI Helper Functions ---
 # ----------------------------------------------------------------------
+def ai_cache_key(model, system_prompt, user_prompt):
+    """Deterministic cache key for an AI completion request."""
+    return hashlib.sha256(f"{model}\n{system_prompt}\n{user_prompt}".encode()).hexdigest()
+
+
+def ai_cache_get(key):
+    """Returns a previously cached AI response, or None on a miss."""
+    try:
+        doc = ai_cache_collection.find_one({'_id': key})
+        return doc['response'] if doc else None
+    except Exception as e:
+        print(f"WARNING: AI cache lookup failed: {e}")
+        return None
+
+
+def ai_cache_put(key, response, embedding=None, kind=None):
+    """Stores an AI response; entries expire via the TTL index on created_at.
+
+    When an embedding of the varying prompt content is supplied, the entry also
+    joins the semantic tier probed by ai_cache_semantic_get."""
+    fields = {'response': response, 'created_at': utcnow()}
+    if embedding:
+        fields['embedding'] = embedding
+        fields['kind'] = kind
+    try:
+        ai_cache_collection.update_one({'_id': key}, {'$set': fields}, upsert=True)
+    except Exception as e:
+        print(f"WARNING: AI cache write failed: {e}")
+
+
+AI_CACHE_SIMILARITY_THRESHOLD = 0.9
+
+
+def ai_cache_semantic_get(embedding, kind):
+    """Second cache tier behind the exact SHA match: near-duplicate content
+    (re-submitted drafts, lightly edited notes) reuses the cached response via
+    $vectorSearch instead of paying a fresh chat completion. Atlas only."""
+    if not IS_ATLAS or not embedding:
+        return None
+    try:
+        hits = ai_cache_collection.aggregate([
+            {'$vectorSearch': {
+                'index': AI_CACHE_VECTOR_INDEX_NAME,
+                'path': 'embedding',
+                'queryVector': embedding,
+                'numCandidates': 50,
+                'limit': 3,
+            }},
+            {'$project': {'response': 1, 'kind': 1, 'score': {'$meta': 'vectorSearchScore'}}}
+        ])
+        for hit in hits:
+            if hit.get('kind') == kind and hit['score'] > AI_CACHE_SIMILARITY_THRESHOLD:
+                return hit['response']
+    except Exception as e:
+        print(f"WARNING: semantic AI cache lookup failed: {e}")
+    return None
+
+
 def get_embedding(text, model="text-embedding-3-small"):
     """Generates a vector embedding for a given text using OpenAI."""
     if not openai.api_key:
@@ -239,45 +633,302 @@ def get_embedding(text, model="text-embedding-3-small"):
         return None
 
 
+# Opt-in: BSON binary vectors (float32) store embeddings in a quarter of the
+# space of the default double[] arrays and decode without a Python list of
+# 1536 floats. Off by default because the Atlas vector index must be of the
+# vectorSearch type (with matching dtype) before BinData vectors are
+# searchable — flip STORE_BINARY_VECTORS=1 once the index is migrated.
+STORE_BINARY_VECTORS = os.environ.get('STORE_BINARY_VECTORS', '0') == '1'
+try:
+    from bson.binary import Binary, BinaryVectorDtype
+except ImportError:  # pymongo < 4.10
+    Binary = BinaryVectorDtype = None
+
+
+def pack_embedding(embedding):
+    """Converts an embedding to its storage form (BinData float32 when binary
+    vector storage is enabled and supported, plain list otherwise)."""
+    if embedding and STORE_BINARY_VECTORS and BinaryVectorDtype is not None:
+        return Binary.from_vector(embedding, BinaryVectorDtype.FLOAT32)
+    return embedding
+
+
+def get_embeddings_batch(texts, model="text-embedding-3-small"):
+    """Embeds several texts with one OpenAI call (the endpoint accepts up to
+    2048 inputs), amortizing the HTTP round-trip across the batch. Returns a
+    list aligned with `texts`; entries are None where embedding failed."""
+    results = [None] * len(texts)
+    if not openai.api_key:
+        print("WARNING: OpenAI API key not set, cannot generate embeddings.")
+        return results
+    pending = [(i, text.replace("\n", " ").strip()) for i, text in enumerate(texts)]
+    pending = [(i, text) for i, text in pending if text]
+    if not pending:
+        return results
+    try:
+        response = openai.embeddings.create(input=[text for _, text in pending], model=model)
+        for (i, _), item in zip(pending, response.data):
+            results[i] = item.embedding
+    except Exception as e:
+        print(f"❌ Error calling OpenAI for batched embeddings: {e}")
+    return results
+
+
+# Semantic cache in front of $vectorSearch: near-identical queries (common as
+# users refine wording) reuse the ranked (id, score) list instead of paying a
+# fresh ANN execution. Scoped per (user, project, tags) so results never leak.
+VECTOR_CACHE_TTL_SECONDS = 120
+VECTOR_CACHE_SIMILARITY = 0.95
+VECTOR_CACHE_MAX_ENTRIES = 16
+_vector_result_cache = {}
+
+
+def _cosine(a, b):
+    # OpenAI embeddings are unit-length, so the dot product is the cosine.
+    return sum(x * y for x, y in zip(a, b))
+
+
+def cached_vector_results(scope_key, query_vector):
+    """Returns a recent ranked result list whose query embedding is nearly
+    identical to this one, or None."""
+    now = time.time()
+    entries = [entry for entry in _vector_result_cache.get(scope_key, ()) if entry[0] > now]
+    _vector_result_cache[scope_key] = entries
+    for _, vec, ranked in entries:
+        if _cosine(vec, query_vector) >= VECTOR_CACHE_SIMILARITY:
+            return ranked
+    return None
+
+
+def store_vector_results(scope_key, query_vector, ranked):
+    if len(_vector_result_cache) > 256:
+        _vector_result_cache.clear()
+    entries = _vector_result_cache.setdefault(scope_key, [])
+    entries.append((time.time() + VECTOR_CACHE_TTL_SECONDS, query_vector, ranked))
+    if len(entries) > VECTOR_CACHE_MAX_ENTRIES:
+        del entries[0]
+
+
+EMBED_CACHE_TTL_SECONDS = 600
+_query_embed_cache = {}
+
+
+def get_embedding_cached(text):
+    """Search queries repeat verbatim while paging through the same result
+    set; caching the query embedding saves an OpenAI round trip per page."""
+    key = hashlib.sha256(text.encode()).hexdigest()
+    now = time.time()
+    cached = _query_embed_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    embedding = get_embedding(text)
+    if embedding:
+        if len(_query_embed_cache) > 1024:
+            _query_embed_cache.clear()
+        _query_embed_cache[key] = (now + EMBED_CACHE_TTL_SECONDS, embedding)
+    return embedding
+
+
+def _backfill_note_embedding(note_id, content):
+    """Computes and stores a note's embedding after the insert has already
+    been acknowledged; runs on the AI pool so writes never wait on OpenAI."""
+    embedding = get_embedding(content)
+    if embedding:
+        notes_collection.update_one({'_id': note_id}, {'$set': {'content_embedding': pack_embedding(embedding)}})
+    else:
+        print(f"WARNING: Failed to generate embedding for note {note_id}")
+
+
 def get_ai_follow_ups(project_goal, original_prompt, entry_content):
     if not openai.api_key: return []
     try:
         system_prompt = f"You are a helpful assistant for a writing project. The project's goal is: '{project_goal}'. Generate 3 insightful, open-ended follow-up questions to encourage deeper exploration of the topic. Based on the user's response to a prompt, generate exactly 3 distinct questions. Return as a JSON array of strings."
         user_prompt = f"Original Prompt: \"{original_prompt}\"\n\nUser's Latest Response:\n\"{entry_content}\"\n\nGenerate 3 follow-up questions."
+        cache_key = ai_cache_key("gpt-4o-mini", system_prompt, user_prompt)
+        cached = ai_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        embedding = get_embedding(f"{original_prompt}\n{entry_content}") if IS_ATLAS else None
+        semantic = ai_cache_semantic_get(embedding, 'follow_ups')
+        if semantic is not None:
+            return semantic
         completion = openai.chat.completions.create(model="gpt-4o-mini",
                                                     messages=[{"role": "system", "content": system_prompt},
                                                               {"role": "user", "content": user_prompt}],
                                                     response_format={"type": "json_object"})
-        questions_data = json.loads(completion.choices[0].message.content)
-        return questions_data.get('questions', []) if isinstance(questions_data, dict) else questions_data if isinstance(
+        questions_data = json_loads(completion.choices[0].message.content)
+        questions = questions_data.get('questions', []) if isinstance(questions_data, dict) else questions_data if isinstance(
             questions_data, list) else []
+        ai_cache_put(cache_key, questions, embedding=embedding, kind='follow_ups')
+        return questions
     except Exception as e:
         print(f"Error calling OpenAI for follow-ups: {e}")
         return []
 
 
-def get_ai_suggested_tags(project_id, entry_content):
-    if not openai.api_key: return []
+def _get_ai_follow_ups_batch(batch):
+    """Answers several queued follow-up requests with a single chat completion."""
+    if not openai.api_key: return {}
     try:
-        example_entries = list(notes_collection.find(
-            {'project_id': ObjectId(project_id), 'user_id': ObjectId(current_user.id),
-             'tags': {'$exists': True, '$ne': []}},
-            {'content': 1, 'tags': 1}
-        ).sort("timestamp", -1).limit(15))
-        example_prompt_part = ""
-        if example_entries:
-            example_prompt_part = "Here are examples of how I've tagged previous notes in this project:\n\n"
-            for entry in example_entries:
-                content_snippet = (entry['content'][:150] + '...') if len(entry['content']) > 150 else entry['content']
-                example_prompt_part += f"- Note: \"{content_snippet.strip()}\"\n  Tags: {', '.join(entry['tags'])}\n"
-        system_prompt = "You are an AI assistant that helps tag notes for a writing project. Suggest 3-5 relevant, concise, single-word or two-word tags. Analyze the new note and the user's past tagging style. Return as a JSON object: {\"tags\": [\"tag1\", \"tag2\"]}."
-        user_prompt = f"{example_prompt_part}Now, suggest tags for this new note:\n\n\"{entry_content}\""
+        system_prompt = ("You are a helpful assistant for writing projects. For each numbered submission below, "
+                         "generate exactly 3 insightful, open-ended follow-up questions that encourage deeper "
+                         "exploration of its topic. Return a JSON object mapping each submission index to its "
+                         "array of 3 questions, e.g. {\"0\": [\"...\"], \"1\": [\"...\"]}.")
+        sections = []
+        for i, entry in enumerate(batch):
+            sections.append(f"Submission {i}\nProject Goal: \"{entry['project_goal']}\"\n"
+                            f"Original Prompt: \"{entry['original_prompt']}\"\n"
+                            f"User's Latest Response:\n\"{entry['entry_content']}\"")
+        user_prompt = "\n\n".join(sections) + "\n\nGenerate 3 follow-up questions for every submission."
         completion = openai.chat.completions.create(model="gpt-4o-mini",
                                                     messages=[{"role": "system", "content": system_prompt},
                                                               {"role": "user", "content": user_prompt}],
                                                     response_format={"type": "json_object"})
-        tags_data = json.loads(completion.choices[0].message.content)
-        return tags_data.get('tags', [])
+        results = json_loads(completion.choices[0].message.content)
+        return results if isinstance(results, dict) else {}
+    except Exception as e:
+        print(f"Error calling OpenAI for batched follow-ups: {e}")
+        return {}
+
+
+class FollowUpBatcher:
+    """Coalesces concurrent follow-up generations into one OpenAI call.
+
+    Invited contributors tend to submit in bursts, and each submission used to
+    pay its own chat-completion round-trip. The first request to arrive waits a
+    short window for others, answers every queued submission with a single
+    completion, and fans the results back out to the waiting requests.
+    """
+
+    WINDOW_SECONDS = 0.25
+    MAX_BATCH = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def generate(self, project_goal, original_prompt, entry_content):
+        entry = {
+            'project_goal': project_goal,
+            'original_prompt': original_prompt,
+            'entry_content': entry_content,
+            'done': threading.Event(),
+            'result': [],
+        }
+        with self._lock:
+            self._pending.append(entry)
+            is_leader = len(self._pending) == 1
+        if is_leader:
+            deadline = time.time() + self.WINDOW_SECONDS
+            while time.time() < deadline:
+                with self._lock:
+                    if len(self._pending) >= self.MAX_BATCH:
+                        break
+                time.sleep(0.01)
+            with self._lock:
+                batch, self._pending = self._pending, []
+            self._run_batch(batch)
+        else:
+            entry['done'].wait(timeout=30)
+        return entry['result']
+
+    def _run_batch(self, batch):
+        try:
+            if len(batch) == 1:
+                entry = batch[0]
+                entry['result'] = get_ai_follow_ups(entry['project_goal'], entry['original_prompt'],
+                                                    entry['entry_content'])
+            else:
+                results = _get_ai_follow_ups_batch(batch)
+                for i, entry in enumerate(batch):
+                    entry['result'] = results.get(str(i), [])
+        finally:
+            for entry in batch:
+                entry['done'].set()
+
+
+follow_up_batcher = FollowUpBatcher()
+
+# Shared pool for AI work that can overlap with database round-trips.
+_ai_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ai-worker')
+# Separate small pool for fire-and-forget work (email notifications) so a
+# backlog of notifications can't starve the latency-sensitive AI calls.
+_notify_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='notify')
+# Pool for overlapping independent Mongo round-trips within one request
+# (e.g. a search page and its count). PyMongo clients are thread-safe.
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='search')
+atexit.register(_ai_executor.shutdown)
+atexit.register(_notify_executor.shutdown)
+
+
+# Rebuild the stored few-shot block only after this many new tagged notes, so
+# the prompt prefix stays byte-stable (and prompt-cacheable) between rebuilds.
+FEW_SHOT_REBUILD_THRESHOLD = 5
+
+
+def _build_few_shot_block(project_obj_id, user_obj_id):
+    """Renders the 15 most-recent tagged notes into the example block used by
+    get_ai_suggested_tags."""
+    # Only the first ~150 chars of each note make it into the prompt, so
+    # truncate server-side instead of shipping whole documents over the wire.
+    # 151 chars lets the formatter tell "truncated" apart from "exactly 150".
+    examples = notes_collection.find(
+        {'project_id': project_obj_id, 'user_id': user_obj_id,
+         'tags': {'$exists': True, '$ne': []}},
+        {'content': {'$substrCP': ['$content', 0, 151]}, 'tags': 1}
+    ).sort("timestamp", -1).limit(15)
+    lines = []
+    for entry in examples:
+        content_snippet = entry['content'][:150] + ('...' if len(entry['content']) > 150 else '')
+        lines.append(f"- Note: \"{content_snippet.strip()}\"\n  Tags: {', '.join(entry['tags'])}\n")
+    if not lines:
+        return ""
+    return "Here are examples of how I've tagged previous notes in this project:\n\n" + "".join(lines)
+
+
+def get_few_shot_block(project):
+    """Returns the project's stored few-shot example block, rebuilding it only
+    when enough new tagged notes have arrived (ai_few_shot_dirty counter).
+    Most suggestion calls therefore skip the notes query entirely."""
+    if (project.get('ai_few_shot_block') is not None
+            and project.get('ai_few_shot_dirty', 0) < FEW_SHOT_REBUILD_THRESHOLD):
+        return project['ai_few_shot_block']
+    block = _build_few_shot_block(project['_id'], project['user_id'])
+    projects_collection.update_one(
+        {'_id': project['_id']},
+        {'$set': {'ai_few_shot_block': block, 'ai_few_shot_dirty': 0}})
+    return block
+
+
+def get_ai_suggested_tags(project, entry_content):
+    if not openai.api_key: return []
+    try:
+        example_prompt_part = get_few_shot_block(project)
+        system_prompt = "You are an AI assistant that helps tag notes for a writing project. Suggest 3-5 relevant, concise, single-word or two-word tags. Analyze the new note and the user's past tagging style. Return as a JSON object: {\"tags\": [\"tag1\", \"tag2\"]}."
+        # Static instructions and the per-project example block lead the
+        # message list, with only the new note varying at the end, so OpenAI's
+        # automatic prompt-prefix cache can reuse the shared prefix across
+        # suggestion calls within the same project.
+        messages = [{"role": "system", "content": system_prompt}]
+        if example_prompt_part:
+            messages.append({"role": "system", "content": example_prompt_part})
+        user_prompt = f"Suggest tags for this new note:\n\n\"{entry_content}\""
+        messages.append({"role": "user", "content": user_prompt})
+        cache_key = ai_cache_key("gpt-4o-mini", system_prompt + "\n" + example_prompt_part, user_prompt)
+        cached = ai_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        embedding = get_embedding(entry_content) if IS_ATLAS else None
+        semantic = ai_cache_semantic_get(embedding, 'tags')
+        if semantic is not None:
+            return semantic
+        completion = openai.chat.completions.create(model="gpt-4o-mini",
+                                                    messages=messages,
+                                                    response_format={"type": "json_object"})
+        tags_data = json_loads(completion.choices[0].message.content)
+        suggested = tags_data.get('tags', [])
+        ai_cache_put(cache_key, suggested, embedding=embedding, kind='tags')
+        return suggested
     except Exception as e:
         print(f"Error calling OpenAI for tag suggestions: {e}")
         return []
@@ -292,7 +943,7 @@ def get_ai_study_notes(topic, project_goal, num_notes=5):
                                                     messages=[{"role": "system", "content": system_prompt},
                                                               {"role": "user", "content": user_prompt}],
                                                     response_format={"type": "json_object"})
-        notes_data = json.loads(completion.choices[0].message.content)
+        notes_data = json_loads(completion.choices[0].message.content)
         return notes_data.get('notes', [])
     except Exception as e:
         print(f"Error calling OpenAI for study notes: {e}")
@@ -321,7 +972,7 @@ def get_ai_quiz(notes_content, num_questions, question_type, difficulty, knowled
                       {"role": "user", "content": user_prompt}],
             response_format={"type": "json_object"}
         )
-        quiz_data = json.loads(completion.choices[0].message.content)
+        quiz_data = json_loads(completion.choices[0].message.content)
         return quiz_data.get('quiz', [])
     except Exception as e:
         print(f"Error calling OpenAI for quiz generation: {e}")
@@ -400,7 +1051,11 @@ def register():
         if existing_user:
             flash('Email address already in use.', 'error')
             return redirect(url_for('register'))
-        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+        # Werkzeug's default (scrypt) is memory-hard and runs in OpenSSL's C
+        # core, unlike the old explicit pbkdf2:sha256 pure-iteration loop.
+        # check_password_hash reads the method from each stored hash, so
+        # existing pbkdf2 accounts keep verifying unchanged.
+        hashed_password = generate_password_hash(password)
         users_collection.insert_one({'email': email, 'password': hashed_password})
         flash('Account created successfully! Please log in.', 'success')
         return redirect(url_for('login'))
@@ -436,12 +1091,10 @@ def logout():
 @app.route('/')
 @login_required
 def index():
-    user_object_id = ObjectId(current_user.id)
+    user_object_id = current_user.oid
+    # Jinja stringifies ObjectId wherever _id is rendered, so no per-row
+    # conversion pass is needed.
     all_projects = list(projects_collection.find({'user_id': user_object_id}).sort("created_at", -1))
-
-    for p in all_projects:
-        p['_id'] = str(p['_id'])
-        
     return render_template('index.html', projects=all_projects)
 
 
@@ -450,22 +1103,33 @@ def index():
 def project_view(project_id):
     try:
         project_obj_id = ObjectId(project_id)
-        project = projects_collection.find_one({"_id": project_obj_id, "user_id": ObjectId(current_user.id)})
-        
-        if not project:
+        # One aggregation gathers the project plus its quizzes and invites,
+        # replacing four sequential find round-trips on every page view.
+        results = list(projects_collection.aggregate([
+            {'$match': {'_id': project_obj_id, 'user_id': current_user.oid}},
+            {'$lookup': {'from': 'quizzes', 'localField': '_id', 'foreignField': 'project_id',
+                         'pipeline': [{'$sort': {'created_at': -1}}], 'as': 'quizzes'}},
+            {'$lookup': {'from': 'invited_users', 'localField': '_id', 'foreignField': 'project_id',
+                         'pipeline': [{'$sort': {'created_at': -1}}], 'as': 'invited_users'}},
+            {'$lookup': {'from': 'shared_invites', 'localField': '_id', 'foreignField': 'project_id',
+                         'pipeline': [{'$sort': {'created_at': -1}}], 'as': 'shared_invites'}},
+        ]))
+
+        if not results:
             flash("Project not found or you don't have access.", "error")
             return redirect(url_for('index'))
-            
-        quizzes = list(quizzes_collection.find({"project_id": project_obj_id}).sort("created_at", -1))
+        project = results[0]
+
+        quizzes = project.pop('quizzes')
         for quiz in quizzes:
             quiz['_id'] = str(quiz['_id'])
 
-        invited_users = list(invited_users_collection.find({"project_id": project_obj_id}).sort("created_at", -1))
+        invited_users = project.pop('invited_users')
         for invite in invited_users:
             invite['_id'] = str(invite['_id'])
             invite['invite_url'] = url_for('invite_note', token=invite['token'], _external=True)
 
-        shared_invites = list(shared_invites_collection.find({"project_id": project_obj_id}).sort("created_at", -1))
+        shared_invites = project.pop('shared_invites')
         for invite in shared_invites:
             invite['_id'] = str(invite['_id'])
             invite['shared_url'] = url_for('shared_invite_page', token=invite['token'], _external=True)
@@ -493,12 +1157,21 @@ def project_view(project_id):
         
 @app.route('/invite/<token>')
 def invite_note(token):
-    invited_user = invited_users_collection.find_one({"token": token})
-    if not invited_user:
+    # New invites store the token as _id; the $or keeps legacy documents that
+    # only carry a token field resolvable too. $lookup pulls the project in
+    # the same round trip instead of a second find_one.
+    results = list(invited_users_collection.aggregate([
+        {'$match': {'$or': [{'_id': token}, {'token': token}]}},
+        {'$limit': 1},
+        {'$lookup': {'from': 'projects', 'localField': 'project_id',
+                     'foreignField': '_id', 'as': 'project'}},
+    ]))
+    if not results:
         return "Invalid invitation token.", 404
-    project = projects_collection.find_one({"_id": invited_user['project_id']})
-    if not project:
+    invited_user = results[0]
+    if not invited_user['project']:
         return "Associated project not found.", 404
+    project = invited_user['project'][0]
     project['_id'] = str(project['_id'])
     return render_template(
         'invite.html',
@@ -512,14 +1185,19 @@ def invite_note(token):
 
 @app.route('/share/<token>')
 def shared_invite_page(token):
-    shared_invite = shared_invites_collection.find_one({"token": token})
-    if not shared_invite:
+    results = list(shared_invites_collection.aggregate([
+        {'$match': {'token': token}},
+        {'$limit': 1},
+        {'$lookup': {'from': 'projects', 'localField': 'project_id',
+                     'foreignField': '_id', 'as': 'project'}},
+    ]))
+    if not results:
         return "Invalid or expired shared invite link.", 404
-    
-    project = projects_collection.find_one({"_id": shared_invite['project_id']})
-    if not project:
+    shared_invite = results[0]
+    if not shared_invite['project']:
         return "Associated project not found.", 404
-        
+
+    project = shared_invite['project'][0]
     project['_id'] = str(project['_id'])
     return render_template(
         'share.html',
@@ -562,7 +1240,7 @@ def generate_shared_token():
     if not all([project_id, prompt]):
         return jsonify({"status": "error", "message": "Project ID and prompt are required."}), 400
     
-    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)})
+    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": current_user.oid})
     if not project:
         return jsonify({"status": "error", "message": "Project not found or unauthorized."}), 404
 
@@ -570,9 +1248,9 @@ def generate_shared_token():
     shared_invites_collection.insert_one({
         "token": new_token,
         "project_id": ObjectId(project_id),
-        "user_id": ObjectId(current_user.id),
+        "user_id": current_user.oid,
         "prompt": prompt,
-        "created_at": datetime.datetime.utcnow()
+        "created_at": utcnow()
     })
     
     shared_url = url_for('shared_invite_page', token=new_token, _external=True)
@@ -594,8 +1272,8 @@ def create_project():
         'name': name,
         'project_goal': project_goal,
         'project_type': project_type,
-        'created_at': datetime.datetime.utcnow(),
-        'user_id': ObjectId(current_user.id)
+        'created_at': utcnow(),
+        'user_id': current_user.oid
     }
     result = projects_collection.insert_one(project_doc)
     project_doc['_id'] = str(result.inserted_id)
@@ -624,16 +1302,24 @@ def add_note():
     except Exception:
         return jsonify({"status": "error", "message": "Invalid project_id"}), 400
 
-    tags = sorted(list(set([tag.strip().lower() for tag in tags_string.split(',') if tag.strip()])))
-    
+    tags = parse_tags(tags_string)
+
     new_follow_ups, contributor_label, notify_me, is_shared = [], 'Me', False, False
+    follow_ups_future, invited_user = None, None
 
     if invite_token:
-        invited_user = invited_users_collection.find_one({"token": invite_token, "project_id": ObjectId(project_id)})
+        invited_user = invited_users_collection.find_one({
+            "$or": [{"_id": invite_token}, {"token": invite_token}],
+            "project_id": ObjectId(project_id),
+        })
         if invited_user:
             contributor_label = invited_user['label']
-            new_follow_ups = get_ai_follow_ups(project['project_goal'], active_prompt or invited_user.get('prompt', ''), content)
-            invited_users_collection.update_one({"token": invite_token}, {"$set": {"last_suggested_questions": new_follow_ups}})
+            # The insert doesn't depend on the follow-ups, so let the OpenAI
+            # call run while the note is embedded and written; the result is
+            # collected just before the response.
+            follow_ups_future = _ai_executor.submit(
+                follow_up_batcher.generate, project['project_goal'],
+                active_prompt or invited_user.get('prompt', ''), content)
             notify_me = True
     elif shared_token:
         shared_invite = shared_invites_collection.find_one({"token": shared_token, "project_id": ObjectId(project_id)})
@@ -650,35 +1336,55 @@ def add_note():
     else:
         return jsonify({"status": "error", "message": "Authentication required"}), 401
 
+    note_timestamp = utcnow()
     new_note_doc = {
         'project_id': ObjectId(project_id), 'user_id': project['user_id'], 'content': content,
-        'timestamp': datetime.datetime.utcnow(), 'contributor_label': contributor_label,
-        'answered_prompt': active_prompt, 'tags': tags
+        'timestamp': note_timestamp, 'contributor_label': contributor_label,
+        'answered_prompt': active_prompt, 'tags': tags,
+        'formatted_timestamp': format_note_timestamp(note_timestamp)
     }
 
+    result = notes_fast_writes.insert_one(new_note_doc)
     if IS_ATLAS:
-        embedding = get_embedding(content)
-        if embedding:
-            new_note_doc['content_embedding'] = embedding
-        else:
-            print(f"WARNING: Failed to generate embedding for new note in project {project_id}")
+        # The embedding is only needed for later vector searches, not for this
+        # response, so backfill it after the insert instead of serializing a
+        # ~200-800ms OpenAI round-trip in front of every write.
+        _ai_executor.submit(_backfill_note_embedding, result.inserted_id, content)
+    bump_tag_counts(new_note_doc['project_id'], tags)
+    if tags:
+        # A new tagged note counts toward the next few-shot block rebuild.
+        projects_collection.update_one({'_id': project['_id']}, {'$inc': {'ai_few_shot_dirty': 1}})
+
+    if follow_ups_future is not None:
+        new_follow_ups = follow_ups_future.result()
+        # Bookkeeping write; the response doesn't depend on it, so don't
+        # serialize an extra round-trip into the request.
+        threading.Thread(
+            target=invited_users_collection.update_one,
+            args=({"_id": invited_user['_id']}, {"$set": {"last_suggested_questions": new_follow_ups}}),
+            daemon=True).start()
+
+    # Echo back only what the frontend renders rather than the whole document.
+    response_note = {
+        '_id': str(result.inserted_id),
+        'project_id': project_id,
+        'content': content,
+        'tags': tags,
+        'contributor_label': contributor_label,
+        'answered_prompt': active_prompt,
+        'formatted_timestamp': new_note_doc['formatted_timestamp'],
+    }
 
-    result = notes_collection.insert_one(new_note_doc)
-    new_note_doc['_id'] = str(result.inserted_id)
-    new_note_doc['project_id'] = str(new_note_doc['project_id'])
-    new_note_doc['formatted_timestamp'] = new_note_doc['timestamp'].strftime('%B %d, %Y, %-I:%M %p')
-    
     if notify_me:
-        project_owner = users_collection.find_one({"_id": project['user_id']})
-        if project_owner:
-            token_for_email = invite_token or shared_token
-            send_notification_email(contributor_label, project['name'], content, token_for_email, project_owner['email'], is_shared=is_shared)
-    
-    del new_note_doc['user_id']
-    if 'content_embedding' in new_note_doc:
-        del new_note_doc['content_embedding']
+        token_for_email = invite_token or shared_token
+        # url_for needs the request context, so build the link here and let the
+        # owner lookup + Mailgun call run in the background.
+        invite_url = (url_for('shared_invite_page', token=token_for_email, _external=True) if is_shared
+                      else url_for('invite_note', token=token_for_email, _external=True))
+        _notify_executor.submit(notify_project_owner, project['user_id'], contributor_label,
+                                project['name'], content, invite_url)
 
-    return jsonify({"status": "success", "note": new_note_doc, "new_follow_ups": new_follow_ups}), 201
+    return jsonify({"status": "success", "note": response_note, "new_follow_ups": new_follow_ups}), 201
 
 
 # ======================================================================
@@ -709,31 +1415,31 @@ def update_or_delete_note(note_id):
         if not content:
             return jsonify({"status": "error", "message": "Content cannot be empty."}), 400
 
-        tags = sorted(list(set([tag.strip().lower() for tag in tags_string.split(',') if tag.strip()])))
+        tags = parse_tags(tags_string)
 
         update_fields = {
             'content': content,
             'tags': tags,
-            'updated_at': datetime.datetime.utcnow()
+            'updated_at': utcnow()
         }
 
         # If content changed, regenerate the embedding for Atlas Vector Search
         if IS_ATLAS and note.get('content') != content:
             embedding = get_embedding(content)
             if embedding:
-                update_fields['content_embedding'] = embedding
+                update_fields['content_embedding'] = pack_embedding(embedding)
             else:
                 print(f"WARNING: Failed to regenerate embedding for updated note {note_id}")
         
         notes_collection.update_one({"_id": note_obj_id}, {"$set": update_fields})
-        
+        old_tags = set(note.get('tags', []))
+        bump_tag_counts(note['project_id'], set(tags) - old_tags, old_tags - set(tags))
+
         updated_note = notes_collection.find_one({"_id": note_obj_id})
         
-        # Format the note for the frontend response
-        updated_note['_id'] = str(updated_note['_id'])
-        updated_note['project_id'] = str(updated_note['project_id'])
-        updated_note['user_id'] = str(updated_note['user_id'])
-        updated_note['formatted_timestamp'] = updated_note['timestamp'].strftime('%B %d, %Y, %-I:%M %p')
+        # Format the note for the frontend response; the JSON provider handles
+        # ObjectId stringification.
+        updated_note['formatted_timestamp'] = updated_note.get('formatted_timestamp') or format_note_timestamp(updated_note['timestamp'])
         if 'content_embedding' in updated_note:
             del updated_note['content_embedding']
         
@@ -743,6 +1449,7 @@ def update_or_delete_note(note_id):
     if request.method == 'DELETE':
         result = notes_collection.delete_one({"_id": note_obj_id})
         if result.deleted_count == 1:
+            bump_tag_counts(note['project_id'], removed_tags=note.get('tags', []))
             return jsonify({"status": "success", "message": "Note deleted successfully."})
         else:
             # This case should be rare given the checks above, but it's good practice
@@ -754,11 +1461,12 @@ def update_or_delete_note(note_id):
 def get_notes(project_id):
     page = int(request.args.get('page', 1, type=int))
     contributor_filter = request.args.get('contributor_filter')
+    after = decode_note_cursor(request.args.get('after', '').strip())
 
     try:
         query = {
             'project_id': ObjectId(project_id),
-            'user_id': ObjectId(current_user.id)
+            'user_id': current_user.oid
         }
     except Exception:
         return jsonify({"error": "Invalid Project ID"}), 400
@@ -766,18 +1474,84 @@ def get_notes(project_id):
     if contributor_filter and contributor_filter != 'All Contributors':
         query['contributor_label'] = contributor_filter
 
-    skip_amount = (page - 1) * NOTES_PER_PAGE
-    notes_cursor = notes_collection.find(query).sort("timestamp", -1).skip(skip_amount).limit(NOTES_PER_PAGE)
+    if after:
+        # Range-based cursor pagination: O(limit) index scan regardless of depth.
+        last_ts, last_id = after
+        query.update(note_cursor_range_filter(last_ts, last_id))
+        notes_cursor = notes_collection.find(query, NOTE_LIST_FIELDS).sort(NOTES_SORT).limit(NOTES_PER_PAGE)
+    else:
+        # Legacy skip/limit path, kept for clients that still send a page number.
+        skip_amount = (page - 1) * NOTES_PER_PAGE
+        notes_cursor = notes_collection.find(query, NOTE_LIST_FIELDS).sort(NOTES_SORT).skip(skip_amount).limit(NOTES_PER_PAGE)
 
+    # The JSON provider stringifies ObjectId/datetime fields itself, so the
+    # loop only fills in the display timestamp for legacy documents.
     notes_data = []
+    last_raw_note = None
     for note in notes_cursor:
-        note['_id'] = str(note['_id'])
-        note['project_id'] = str(note['project_id'])
-        note['user_id'] = str(note['user_id'])
-        note['formatted_timestamp'] = note['timestamp'].strftime('%B %d, %Y, %-I:%M %p')
+        last_raw_note = (note['timestamp'], note['_id'])
+        note['formatted_timestamp'] = note.get('formatted_timestamp') or format_note_timestamp(note['timestamp'])
         notes_data.append(note)
 
-    return jsonify(notes_data)
+    next_cursor = None
+    if last_raw_note and len(notes_data) == NOTES_PER_PAGE:
+        next_cursor = encode_note_cursor(*last_raw_note)
+
+    return jsonify({"notes": notes_data, "next_cursor": next_cursor})
+
+
+@app.route('/api/project-bootstrap/<project_id>')
+@login_required
+def project_bootstrap(project_id):
+    """Single round-trip payload for the project page's initial load.
+
+    One $facet aggregation returns the first page of notes, the tag list and
+    the contributor labels that previously required separate requests."""
+    try:
+        match = {'project_id': ObjectId(project_id), 'user_id': current_user.oid}
+    except Exception:
+        return jsonify({"error": "Invalid Project ID"}), 400
+
+    try:
+        facet_stage = {
+            '$facet': {
+                'latest_notes': [
+                    {'$sort': {'timestamp': -1, '_id': -1}},
+                    {'$limit': NOTES_PER_PAGE},
+                    {'$project': NOTE_LIST_FIELDS}
+                ],
+                'contributors': [
+                    {'$group': {'_id': '$contributor_label'}}
+                ]
+            }
+        }
+        result = next(notes_collection.aggregate([{'$match': match}, facet_stage]), {})
+
+        notes_data = []
+        last_raw_note = None
+        for note in result.get('latest_notes', []):
+            last_raw_note = (note['timestamp'], note['_id'])
+            note['formatted_timestamp'] = note.get('formatted_timestamp') or format_note_timestamp(note['timestamp'])
+            notes_data.append(note)
+
+        next_cursor = None
+        if last_raw_note and len(notes_data) == NOTES_PER_PAGE:
+            next_cursor = encode_note_cursor(*last_raw_note)
+
+        labels = {doc['_id'] for doc in result.get('contributors', []) if doc['_id']}
+        labels.update(invited_users_collection.distinct('label', {'project_id': match['project_id']}))
+        sorted_labels = sorted(labels - {'Me'})
+        if 'Me' in labels: sorted_labels.insert(0, 'Me')
+
+        return jsonify({
+            "notes": notes_data,
+            "next_cursor": next_cursor,
+            "tags": get_project_tags(match['project_id'], match['user_id']),
+            "contributors": ['All Contributors'] + sorted_labels
+        })
+    except Exception as e:
+        print(f"Error bootstrapping project view: {e}")
+        return jsonify({"error": "Could not load project data"}), 500
 
 
 @app.route('/api/generate-token', methods=['POST'])
@@ -789,14 +1563,16 @@ def generate_token():
     if not all([label, project_id, prompt]):
         return jsonify({"status": "error", "message": "All fields are required."}), 400
 
-    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)})
+    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": current_user.oid})
     if not project:
         return jsonify({"status": "error", "message": "Project not found or unauthorized."}), 404
 
     new_token = str(uuid.uuid4())
+    # The token doubles as _id, so lookups are primary-key point queries. The
+    # token field is kept for templates and older documents.
     invited_users_collection.insert_one({
-        "token": new_token, "label": label, "project_id": ObjectId(project_id), "prompt": prompt,
-        "created_at": datetime.datetime.utcnow()
+        "_id": new_token, "token": new_token, "label": label, "project_id": ObjectId(project_id), "prompt": prompt,
+        "created_at": utcnow()
     })
     invite_url = url_for('invite_note', token=new_token, _external=True)
     return jsonify({"status": "success", "label": label, "invite_url": invite_url}), 201
@@ -810,10 +1586,10 @@ def suggest_tags():
     content, project_id = data.get('content'), data.get('project_id')
     if not content or not project_id: return jsonify({"error": "Content and project_id are required."}), 400
 
-    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)})
+    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": current_user.oid})
     if not project: return jsonify({"error": "Project not found or unauthorized."}), 404
 
-    suggested_tags = get_ai_suggested_tags(project_id, content)
+    suggested_tags = get_ai_suggested_tags(project, content)
     return jsonify({"tags": suggested_tags})
 
 
@@ -826,61 +1602,83 @@ def search_notes(project_id):
   
         search_query = request.args.get('q', '').strip()  
         tags_filter = request.args.get('tags', '').strip()  
-        search_type = request.args.get('search_type', 'text').strip().lower()  
-        page = int(request.args.get('page', 1))  
-        per_page = 20  
+        search_type = request.args.get('search_type', 'text').strip().lower()
+        page = int(request.args.get('page', 1))
+        per_page = 20
+        after = decode_note_cursor(request.args.get('after', '').strip())
+        # Opaque Atlas Search resume token ($meta searchSequenceToken) from a
+        # previous page; lets $search continue where it left off instead of
+        # re-walking skipped results.
+        search_after = request.args.get('search_after', '').strip()
   
         current_project_id = ObjectId(project_id)  
-        current_user_id = ObjectId(current_user.id)  
+        current_user_id = current_user.oid  
           
         base_mql_filter = {  
             'project_id': current_project_id,  
             'user_id': current_user_id  
         }  
           
-        tags_list = []  
-        if tags_filter:  
-            tags_list = [tag.strip().lower() for tag in tags_filter.split(',') if tag.strip()]  
+        tags_list = parse_tags(tags_filter)
+
+        # Counts are bounded (the UI shows "1000+") and reused across pages of
+        # the same result set instead of being recomputed per request.
+        count_key = (current_user.id, project_id, search_query, tags_filter, search_type)
   
         total_notes = 0
         notes_data = []
+        next_search_after = None
+        # Cursor pagination only applies to timestamp-ordered branches; relevance-
+        # sorted results have no stable range key and keep the skip/limit path.
+        cursor_eligible = False
 
         if IS_ATLAS:  
             pipeline = []  
             use_vector_search = (search_query and search_type == 'vector')
   
-            if use_vector_search:  
-                query_vector = get_embedding(search_query)  
-                if not query_vector:  
-                    return jsonify({"error": "Failed to generate a vector for the search query."}), 500  
-                
-                vector_filter = {
-                    'must': [
-                        {'equals': {'path': 'project_id', 'value': current_project_id}},
-                        {'equals': {'path': 'user_id', 'value': current_user_id}}
+            if use_vector_search:
+                query_vector = get_embedding_cached(search_query)
+                if not query_vector:
+                    return jsonify({"error": "Failed to generate a vector for the search query."}), 500
+
+                scope_key = (current_user.id, project_id, tags_filter)
+                ranked = cached_vector_results(scope_key, query_vector)
+                if ranked is None:
+                    vector_filter = {
+                        'must': [
+                            {'equals': {'path': 'project_id', 'value': current_project_id}},
+                            {'equals': {'path': 'user_id', 'value': current_user_id}}
+                        ]
+                    }
+                    if tags_list:
+                        vector_filter['must'].append({'in': {'path': 'tags', 'value': tags_list}})
+
+                    # Rank once, projecting only ids and scores; pages then
+                    # become O(1) slices instead of fresh ANN executions.
+                    ann_pipeline = [
+                        {'$vectorSearch': {
+                            'index': ATLAS_VECTOR_SEARCH_INDEX_NAME,
+                            'path': 'content_embedding',
+                            'queryVector': query_vector,
+                            'numCandidates': ATLAS_NUM_CANDIDATES,
+                            'limit': ATLAS_SEARCH_LIMIT,
+                            'filter': vector_filter
+                        }},
+                        ANN_SCORE_PROJECTION
                     ]
-                }
-                if tags_list:
-                    vector_filter['must'].append({'in': {'path': 'tags', 'value': tags_list}})
-
-                pipeline.append({  
-                    '$vectorSearch': {  
-                        'index': ATLAS_VECTOR_SEARCH_INDEX_NAME,  
-                        'path': 'content_embedding',  
-                        'queryVector': query_vector,  
-                        'numCandidates': ATLAS_NUM_CANDIDATES,  
-                        'limit': ATLAS_SEARCH_LIMIT,  
-                        'filter': vector_filter
-                    }  
-                })  
-                pipeline.append({  
-                    '$project': {  
-                        'score': {'$meta': 'vectorSearchScore'},  
-                        'content': 1, 'timestamp': 1, 'tags': 1,    
-                        'contributor_label': 1, 'project_id': 1, 'user_id': 1  
-                    }  
-                })  
-                pipeline.append({'$sort': {'score': -1}})  
+                    ranked = [(doc['_id'], doc['score']) for doc in notes_collection.aggregate(ann_pipeline)]
+                    store_vector_results(scope_key, query_vector, ranked)
+
+                total_notes = len(ranked)
+                page_slice = ranked[(page - 1) * per_page:(page - 1) * per_page + per_page]
+                if page_slice:
+                    docs_by_id = {doc['_id']: doc for doc in notes_collection.find(
+                        {'_id': {'$in': [note_id for note_id, _ in page_slice]}}, NOTE_LIST_FIELDS)}
+                    for note_id, score in page_slice:
+                        doc = docs_by_id.get(note_id)
+                        if doc is not None:
+                            doc['score'] = score
+                            notes_data.append(doc)
 
             elif search_query or tags_list:
                 must_conditions = []  
@@ -896,85 +1694,145 @@ def search_notes(project_id):
                 if tags_list:
                     filter_conditions.append({'in': {'path': 'tags', 'value': tags_list}})
 
-                search_stage = {  
-                    '$search': {  
-                        'index': ATLAS_LUCENE_INDEX_NAME,  
-                        'compound': {  
-                            'filter': filter_conditions,  
+                search_stage = {
+                    '$search': {
+                        'index': ATLAS_LUCENE_INDEX_NAME,
+                        'compound': {
+                            'filter': filter_conditions,
                             **({'must': must_conditions} if must_conditions else {})
-                        }
-                    }  
-                }  
-  
-                pipeline.append(search_stage)  
-                pipeline.append({  
-                    '$project': {  
-                        '_id': 1, 'content': 1, 'timestamp': 1, 'tags': 1,    
-                        'contributor_label': 1, 'project_id': 1, 'user_id': 1,
-                        'search_score': {'$meta': 'searchScore'}
+                        },
+                        # Sorting inside $search keeps results searchAfter-able;
+                        # relevance order for text queries, recency otherwise.
+                        'sort': ({'score': {'$meta': 'searchScore'}} if must_conditions
+                                 else {'timestamp': -1}),
                     }
-                })
-                
-                if ATLAS_SEARCH_LIMIT:  
-                    pipeline.append({'$limit': ATLAS_SEARCH_LIMIT})  
-                      
-                if must_conditions:
-                    pipeline.append({'$sort': {'search_score': -1}})
-                else:
-                    pipeline.append({'$sort': {'timestamp': -1}})
+                }
+                # Deep pages resume from an opaque token instead of $skip, so
+                # page N costs the same as page 1.
+                if search_after:
+                    search_stage['$search']['searchAfter'] = search_after
+
+                pipeline.append(search_stage)
+                # Only ids, scores and resume tokens flow through the search
+                # pipeline; the visible page is hydrated afterwards with a
+                # single indexed _id fetch, keeping note content out of the
+                # mongot->mongod hop entirely.
+                pipeline.append(SEARCH_HIT_PROJECTION)
             
-            if pipeline:  
-                count_pipeline = pipeline[:] + [{'$count': 'total'}]  
-                total_notes_doc = next(notes_collection.aggregate(count_pipeline), {})  
-                total_notes = total_notes_doc.get('total', 0)  
-  
-                pipeline.extend([  
-                    {'$skip': (page - 1) * per_page},    
-                    {'$limit': per_page}  
-                ])  
-                notes_data = list(notes_collection.aggregate(pipeline))  
-            else:  
-                total_notes = notes_collection.count_documents(base_mql_filter)  
-                notes_data = list(  
-                    notes_collection.find(base_mql_filter)  
-                    .sort("timestamp", -1)  
-                    .skip((page-1)*per_page)  
-                    .limit(per_page)  
-                )
-                
+            if pipeline:
+                # $searchMeta answers the count from index metadata without
+                # materializing a single document, so counting no longer runs
+                # the whole search a second time. lowerBound stops exact
+                # counting at the same cap the UI already treats as "N+".
+                meta_pipeline = [{'$searchMeta': {
+                    'index': ATLAS_LUCENE_INDEX_NAME,
+                    'compound': search_stage['$search']['compound'],
+                    'count': {'type': 'lowerBound', 'threshold': SEARCH_COUNT_LIMIT}
+                }}]
+
+                def run_meta_count():
+                    meta = next(notes_collection.aggregate(meta_pipeline), {})
+                    count_info = meta.get('count', {})
+                    return count_info.get('total', count_info.get('lowerBound', 0))
+
+                if search_after:
+                    pipeline.append({'$limit': per_page})
+                else:
+                    pipeline.extend([
+                        {'$skip': (page - 1) * per_page},
+                        {'$limit': per_page}
+                    ])
+                # Fire the page query first so a cold count overlaps with it
+                # instead of running back-to-back.
+                page_future = _search_executor.submit(
+                    lambda: list(notes_collection.aggregate(pipeline)))
+                total_notes = cached_note_count(count_key, run_meta_count)
+                hits = page_future.result()
+                if hits:
+                    next_search_after = hits[-1].get('paginationToken')
+                    docs_by_id = {doc['_id']: doc for doc in notes_collection.find(
+                        {'_id': {'$in': [hit['_id'] for hit in hits]}}, NOTE_LIST_FIELDS)}
+                    for hit in hits:
+                        doc = docs_by_id.get(hit['_id'])
+                        if doc is not None:
+                            doc['search_score'] = hit['search_score']
+                            notes_data.append(doc)
+            elif not use_vector_search:
+                cursor_eligible = True
+                total_notes = cached_note_count(
+                    count_key,
+                    lambda: notes_collection.count_documents(
+                        base_mql_filter, limit=SEARCH_COUNT_LIMIT,
+                        hint=[("project_id", 1), ("user_id", 1), ("timestamp", -1), ("_id", -1)]))
+                browse_query = base_mql_filter.copy()
+                if after:
+                    browse_query.update(note_cursor_range_filter(*after))
+                browse_cursor = notes_collection.find(browse_query, NOTE_LIST_FIELDS).sort(NOTES_SORT)
+                if not after:
+                    browse_cursor = browse_cursor.skip((page - 1) * per_page)
+                notes_data = list(browse_cursor.limit(per_page))
+
             total_pages = (total_notes + per_page - 1) // per_page if per_page > 0 else 0
-                      
-        else:  
-            query = base_mql_filter.copy()  
-            
-            if tags_list:  
-                 query['tags'] = {'$all': tags_list} 
 
-            if search_query:  
-                query['$text'] = {'$search': search_query}  
-                  
-            total_notes = notes_collection.count_documents(query)  
+        else:
+            query = base_mql_filter.copy()
+
+            if tags_list:
+                 query['tags'] = {'$all': tags_list}
+
+            if search_query:
+                query['$text'] = {'$search': search_query}
+
+            if search_query:
+                # $text must plan through the text index, so no hint here.
+                total_notes = cached_note_count(
+                    count_key,
+                    lambda: notes_collection.count_documents(query, limit=SEARCH_COUNT_LIMIT))
+            else:
+                count_hint = ([("project_id", 1), ("user_id", 1), ("tags", 1), ("timestamp", -1)] if tags_list
+                              else [("project_id", 1), ("user_id", 1), ("timestamp", -1), ("_id", -1)])
+                total_notes = cached_note_count(
+                    count_key,
+                    lambda: notes_collection.count_documents(query, limit=SEARCH_COUNT_LIMIT, hint=count_hint))
             total_pages = (total_notes + per_page - 1) // per_page if per_page > 0 else 0
-            notes_data = list(  
-                notes_collection.find(query)  
-                .sort([('score', {'$meta': 'textScore'})] if search_query else [("timestamp", -1)])
-                .skip((page - 1) * per_page)  
-                .limit(per_page)  
-            )  
-  
-        for note in notes_data:  
-            timestamp = note.get('timestamp', datetime.datetime.utcnow())  
-            note['_id'] = str(note['_id'])  
-            note['project_id'] = str(note.get('project_id', project_id))  
-            note['user_id'] = str(note.get('user_id', current_user.id))  
-            note['formatted_timestamp'] = timestamp.strftime('%B %d, %Y, %-I:%M %p')  
+            if search_query:
+                # Only the top of a scored result set is ever shown; cap how
+                # deep paging can walk the text index, mirroring the Atlas
+                # search limit.
+                total_pages = min(total_pages, TEXT_SEARCH_MAX_RESULTS // per_page)
+                max_skip = max(TEXT_SEARCH_MAX_RESULTS - per_page, 0)
+                notes_data = list(
+                    notes_collection.find(query, {**NOTE_LIST_FIELDS, 'score': {'$meta': 'textScore'}})
+                    .sort([('score', {'$meta': 'textScore'})])
+                    .skip(min((page - 1) * per_page, max_skip))
+                    .limit(per_page)
+                )
+            else:
+                cursor_eligible = True
+                if after:
+                    query.update(note_cursor_range_filter(*after))
+                browse_cursor = notes_collection.find(query, NOTE_LIST_FIELDS).sort(NOTES_SORT)
+                if not after:
+                    browse_cursor = browse_cursor.skip((page - 1) * per_page)
+                notes_data = list(browse_cursor.limit(per_page))
+
+        next_cursor = None
+        if cursor_eligible and len(notes_data) == per_page:
+            last_note = notes_data[-1]
+            next_cursor = encode_note_cursor(last_note['timestamp'], last_note['_id'])
+
+        for note in notes_data:
+            timestamp = note.get('timestamp', utcnow())
+            note['formatted_timestamp'] = note.get('formatted_timestamp') or format_note_timestamp(timestamp)
   
-        return jsonify({  
-            "notes": notes_data,    
-            "total_pages": total_pages,    
-            "current_page": page,    
-            "total_notes": total_notes  
-        })  
+        return jsonify({
+            "notes": notes_data,
+            "total_pages": total_pages,
+            "current_page": page,
+            "total_notes": total_notes,
+            "next_cursor": next_cursor,
+            "next_search_after": next_search_after
+        })
   
     except OperationFailure as e:  
         print(f"❌ MongoDB Operation Failure in /search-notes: {e.details}")  
@@ -989,32 +1847,74 @@ def search_notes(project_id):
         return jsonify({"error": f"An internal server error occurred: {str(e)}"}), 500
 
 
+def get_project_tags(project_obj_id, user_obj_id):
+    """Distinct tags for a project, served from the tag_counts summary.
+
+    Projects seeded before the summary collection existed fall back to
+    aggregating the notes directly."""
+    tag_docs = list(tag_counts_collection.find(
+        {'project_id': project_obj_id, 'count': {'$gt': 0}}, {'tag': 1}).sort('tag', 1))
+    if tag_docs:
+        return [doc['tag'] for doc in tag_docs]
+    pipeline = [{'$match': {'project_id': project_obj_id, 'user_id': user_obj_id}},
+                {'$unwind': '$tags'}, {'$group': {'_id': '$tags'}}, {'$sort': {'_id': 1}}]
+    return [doc['_id'] for doc in notes_collection.aggregate(pipeline)]
+
+
+def conditional_json(payload):
+    """Small-list endpoints (tags, contributors) are hit on every project page
+    load but rarely change; an ETag lets repeat visits revalidate with a 304
+    instead of re-running the aggregation transfer."""
+    resp = jsonify(payload)
+    resp.headers['Cache-Control'] = 'private, max-age=60'
+    resp.set_etag(hashlib.md5(resp.get_data()).hexdigest())
+    return resp.make_conditional(request)
+
+
 @app.route('/api/get-tags/<project_id>')
 @login_required
 def get_tags(project_id):
     try:
-        pipeline = [{'$match': {'project_id': ObjectId(project_id), 'user_id': ObjectId(current_user.id)}},
-                    {'$unwind': '$tags'}, {'$group': {'_id': '$tags'}}, {'$sort': {'_id': 1}}]
-        tags = [doc['_id'] for doc in notes_collection.aggregate(pipeline)]
-        return jsonify(tags)
+        return conditional_json(get_project_tags(ObjectId(project_id), current_user.oid))
     except Exception as e:
         print(f"Error getting tags: {e}")
         return jsonify({"error": "Could not retrieve tags"}), 500
 
 
+CONTRIBUTORS_TTL_SECONDS = 60
+_contributors_cache = {}
+
+
 @app.route('/api/contributors/<project_id>')
 @login_required
 def get_contributors(project_id):
     try:
-        labels = set(notes_collection.distinct('contributor_label',
-                                               {'project_id': ObjectId(project_id),
-                                                'user_id': ObjectId(current_user.id)}))
-        invited_labels = set(
-            invited_users_collection.distinct('label', {'project_id': ObjectId(project_id)}))
-        labels.update(invited_labels)
-        sorted_labels = sorted(list(labels - {'Me'}))
+        cache_key = (current_user.id, project_id)
+        now = time.time()
+        cached = _contributors_cache.get(cache_key)
+        if cached and cached[0] > now:
+            return conditional_json(cached[1])
+        # One $unionWith aggregation replaces two distinct() round-trips.
+        pipeline = [
+            {'$match': {'project_id': ObjectId(project_id), 'user_id': current_user.oid}},
+            {'$project': {'label': '$contributor_label'}},
+            {'$unionWith': {
+                'coll': 'invited_users',
+                'pipeline': [
+                    {'$match': {'project_id': ObjectId(project_id)}},
+                    {'$project': {'label': 1}}
+                ]
+            }},
+            {'$group': {'_id': '$label'}}
+        ]
+        labels = {doc['_id'] for doc in notes_collection.aggregate(pipeline) if doc['_id']}
+        sorted_labels = sorted(labels - {'Me'})
         if 'Me' in labels: sorted_labels.insert(0, 'Me')
-        return jsonify(['All Contributors'] + sorted_labels)
+        payload = ['All Contributors'] + sorted_labels
+        if len(_contributors_cache) > 1024:
+            _contributors_cache.clear()
+        _contributors_cache[cache_key] = (now + CONTRIBUTORS_TTL_SECONDS, payload)
+        return conditional_json(payload)
     except Exception as e:
         print(f"Error getting contributors: {e}")
         return jsonify({"error": "Could not retrieve contributors"}), 500
@@ -1031,35 +1931,43 @@ def generate_notes():
     if not all([project_id, topic]):
         return jsonify({"error": "Project ID and topic are required."}), 400
 
-    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)})
+    project = projects_collection.find_one({"_id": ObjectId(project_id), "user_id": current_user.oid})
     if not project: return jsonify({"error": "Project not found or unauthorized."}), 404
 
     generated_notes_content = get_ai_study_notes(topic, project.get('project_goal', ''), num_notes)
     if not generated_notes_content: return jsonify({"error": "AI failed to generate notes."}), 500
     
     new_notes_docs = []
-    for content in generated_notes_content:
+    generated_tags = ['ai-generated', topic.lower().replace(' ', '-')]
+    # One embeddings call for the whole batch instead of one per note.
+    embeddings = get_embeddings_batch(generated_notes_content) if IS_ATLAS else [None] * len(generated_notes_content)
+    for content, embedding in zip(generated_notes_content, embeddings):
+        note_timestamp = utcnow()
+        # Pre-assigned _ids let the response echo the documents without a
+        # round-trip back to the server after the bulk write.
         note_doc = {
+            '_id': ObjectId(),
             'project_id': ObjectId(project_id),
             'user_id': project['user_id'],
             'content': content,
-            'timestamp': datetime.datetime.utcnow(),
+            'timestamp': note_timestamp,
             'contributor_label': 'AI Assistant',
-            'tags': ['ai-generated', topic.lower().replace(' ', '-')]
+            'tags': generated_tags,
+            'formatted_timestamp': format_note_timestamp(note_timestamp)
         }
-        if IS_ATLAS:
-            embedding = get_embedding(content)
-            if embedding:
-                note_doc['content_embedding'] = embedding
+        if embedding:
+            note_doc['content_embedding'] = pack_embedding(embedding)
+        new_notes_docs.append(note_doc)
 
-        result = notes_collection.insert_one(note_doc)
-        note_doc['_id'] = str(result.inserted_id)
+    if new_notes_docs:
+        notes_fast_writes.insert_many(new_notes_docs, ordered=False)
+        bump_tag_counts(ObjectId(project_id), generated_tags * len(new_notes_docs))
+
+    for note_doc in new_notes_docs:
+        note_doc['_id'] = str(note_doc['_id'])
         note_doc['project_id'] = str(note_doc['project_id'])
         note_doc['user_id'] = str(note_doc['user_id'])
-        note_doc['formatted_timestamp'] = note_doc['timestamp'].strftime('%B %d, %Y, %-I:%M %p')
-        if 'content_embedding' in note_doc:
-            del note_doc['content_embedding']
-        new_notes_docs.append(note_doc)
+        note_doc.pop('content_embedding', None)
 
     return jsonify({"status": "success", "notes": new_notes_docs})
 
@@ -1081,7 +1989,7 @@ def generate_quiz():
 
     try: 
         first_note_id = selected_notes[0].get('_id')
-        note_check = notes_collection.find_one({"_id": ObjectId(first_note_id), "user_id": ObjectId(current_user.id)})
+        note_check = notes_collection.find_one({"_id": ObjectId(first_note_id), "user_id": current_user.oid})
         if not note_check: return jsonify({"error": "Unauthorized"}), 403
         project_id = note_check['project_id']
     except Exception: return jsonify({"error": "Invalid note ID provided"}), 400
@@ -1095,13 +2003,13 @@ def generate_quiz():
     share_token = str(uuid.uuid4())
     
     quiz_doc = {
-        "user_id": ObjectId(current_user.id),
+        "user_id": current_user.oid,
         "project_id": project_id,
         "title": quiz_title,
         "quiz_data": quiz_data,
         "question_type": question_type,
         "source_note_ids": [ObjectId(note['_id']) for note in selected_notes],
-        "created_at": datetime.datetime.utcnow(),
+        "created_at": utcnow(),
         "share_token": share_token
     }
     
@@ -1129,7 +2037,7 @@ def generate_story():
         first_note_id = selected_notes[0].get('_id')
         try:
             note_check = notes_collection.find_one(
-                {"_id": ObjectId(first_note_id), "user_id": ObjectId(current_user.id)})
+                {"_id": ObjectId(first_note_id), "user_id": current_user.oid})
             if not note_check:
                 return jsonify({"error": "Unauthorized"}), 403
         except Exception:
@@ -1140,10 +2048,47 @@ def generate_story():
     try:
         system_prompt = "You are a master writer. Weave a collection of notes into a coherent, compelling narrative. If notes are from multiple contributors, synthesize them into a single voice or a structured dialogue, as appropriate."
         user_prompt = f"Synthesize these notes from the \"{project_name}\" project into a narrative with a \"{tone}\" tone, formatted as a \"{story_format}\". Connect the ideas, infer themes, and create a fluid arc.\n\nNotes:\n{formatted_notes}"
+        cache_key = ai_cache_key("gpt-4o-mini", system_prompt, user_prompt)
+        cached = ai_cache_get(cache_key)
+        want_stream = bool(data.get('stream'))
+
+        if cached is not None:
+            if want_stream:
+                def replay():
+                    yield f"data: {json.dumps({'delta': cached})}\n\n"
+                    yield "data: [DONE]\n\n"
+                return Response(stream_with_context(replay()), mimetype='text/event-stream')
+            return jsonify({"story": cached})
+
+        # max_tokens bounds the 3-5 paragraph formats so the model doesn't run long.
         completion = openai.chat.completions.create(model="gpt-4o-mini",
                                                     messages=[{"role": "system", "content": system_prompt},
-                                                              {"role": "user", "content": user_prompt}])
-        return jsonify({"story": completion.choices[0].message.content})
+                                                              {"role": "user", "content": user_prompt}],
+                                                    max_tokens=600,
+                                                    temperature=0.7,
+                                                    stream=want_stream)
+        if want_stream:
+            # SSE the deltas so the first tokens reach the browser in ~300ms
+            # instead of after the full completion.
+            def generate():
+                chunks = []
+                try:
+                    for chunk in completion:
+                        delta = chunk.choices[0].delta.content or '' if chunk.choices else ''
+                        if delta:
+                            chunks.append(delta)
+                            yield f"data: {json.dumps({'delta': delta})}\n\n"
+                except Exception as e:
+                    print(f"Error streaming story: {e}")
+                    yield f"data: {json.dumps({'error': 'Failed to generate story from AI.'})}\n\n"
+                    return
+                ai_cache_put(cache_key, ''.join(chunks))
+                yield "data: [DONE]\n\n"
+            return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
+        story = completion.choices[0].message.content
+        ai_cache_put(cache_key, story)
+        return jsonify({"story": story})
     except Exception as e:
         print(f"Error during story generation: {e}")
         return jsonify({"error": "Failed to generate story from AI."}), 500
@@ -1161,7 +2106,7 @@ def generate_study_guide():
 
     first_note_id = selected_notes[0].get('_id')
     try:
-        note_check = notes_collection.find_one({"_id": ObjectId(first_note_id), "user_id": ObjectId(current_user.id)})
+        note_check = notes_collection.find_one({"_id": ObjectId(first_note_id), "user_id": current_user.oid})
         if not note_check: return jsonify({"error": "Unauthorized"}), 403
     except Exception:
         return jsonify({"error": "Invalid note ID provided"}), 400
@@ -1186,7 +2131,7 @@ def generate_song():
 
     try:
         first_note_id = selected_notes[0].get('_id')
-        note_check = notes_collection.find_one({"_id": ObjectId(first_note_id), "user_id": ObjectId(current_user.id)})
+        note_check = notes_collection.find_one({"_id": ObjectId(first_note_id), "user_id": current_user.oid})
         if not note_check:
             return jsonify({"error": "Unauthorized action."}), 403
     except Exception:
@@ -1208,4 +2153,4 @@ if __name__ == '__main__':
     # This block is now ONLY for running the app locally for development
     # (e.g., python app.py)
     # Gunicorn and Render will IGNORE this block.
-    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5001)), debug=True)
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5001)), debug=True, threaded=True)
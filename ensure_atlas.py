@@ -32,9 +32,13 @@ except Exception as e:
 
 
 def wait_for_index(coll, index_name: str, timeout: int = 600):
-    """Polls search indexes until the specified index is ready."""
+    """Polls search indexes until the specified index is ready.
+
+    Starts with quick checks (fresh small indexes are often ready within
+    seconds) and backs off exponentially to a 10s cap for the long tail."""
     print(f"⏳ Waiting for index '{index_name}' to be ready... (This can take several minutes)")
     start_time = time.time()
+    delay = 1.0
     while time.time() - start_time < timeout:
         try:
             # list_search_indexes() can now accept a name parameter
@@ -42,15 +46,14 @@ def wait_for_index(coll, index_name: str, timeout: int = 600):
             if indexes and (indexes[0].get('status') == 'READY' or indexes[0].get('queryable') == True):
                 print(f"✅ Index '{index_name}' is ready.")
                 return True
-            print(f"   - Index '{index_name}' not ready yet. Status: {indexes[0].get('status', 'Unknown')}. Checking again in 10 seconds...")
-            time.sleep(10)
+            print(f"   - Index '{index_name}' not ready yet. Status: {indexes[0].get('status', 'Unknown')}. Checking again in {delay:.0f} seconds...")
         except OperationFailure as e:
             print(f"   - OperationFailure while checking index status: {e.details}. Retrying...")
-            time.sleep(10)
         except IndexError:
             # This can happen if the index hasn't been recognized by the API yet
             print(f"   - Index '{index_name}' not found in list. It might still be provisioning. Retrying...")
-            time.sleep(10)
+        time.sleep(delay)
+        delay = min(delay * 2, 10.0)
 
     raise TimeoutError(f"❌ Index '{index_name}' did not become ready in {timeout}s.")
 
@@ -0,0 +1,19 @@
+import multiprocessing
+import os
+
+# Every hot route in app.py is I/O-bound (PyMongo queries, OpenAI completions,
+# Mailgun posts). Threaded workers release the GIL during those network waits,
+# so one slow generate-story call no longer pins an entire worker process.
+# gthread is preferred over gevent here: pymongo and the OpenAI client both
+# lean on C-extension networking that monkey-patching handles poorly, and
+# threads give the same concurrency win for this request mix without it.
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Multi-second OpenAI calls (story/quiz/study-guide generation) need headroom
+# beyond gunicorn's 30s default before the worker is killed.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
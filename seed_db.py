@@ -1,12 +1,15 @@
 import datetime
+import hashlib
 import os
+import random
+import shelve
 import sys
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-import openai
 from bson.objectid import ObjectId
-from pymongo import MongoClient
+from pymongo import InsertOne, MongoClient, UpdateOne
 from werkzeug.security import generate_password_hash
 
 # Load .env variables from a .env file if present
@@ -14,14 +17,26 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # --- Configuration ---
+# (dotenv stays at module load: MONGO_URI below depends on it.)
 MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/?retryWrites=true&w=majority&directConnection=true')
-openai.api_key = os.environ.get('OPENAI_API_KEY')
 
-if not openai.api_key:
-    print("❌ FATAL: OPENAI_API_KEY environment variable not set. Cannot generate embeddings for seed data.")
-    sys.exit(1)
+_openai = None
 
-client = MongoClient(MONGO_URI)
+
+def _require_openai():
+    """Imports the OpenAI SDK on first use, so --no-embeddings runs don't
+    pay its import cost — or need it installed at all."""
+    global _openai
+    if _openai is None:
+        import openai
+        openai.api_key = os.environ.get('OPENAI_API_KEY')
+        _openai = openai
+    return _openai
+
+# Seed data is disposable, so skip replica acknowledgment (w=1) and the
+# journal fsync wait; a single-threaded seeder also has no use for the
+# default 100-connection pool.
+client = MongoClient(MONGO_URI, w=1, journal=False, maxPoolSize=4)
 db = client['story_weaver_auth']
 
 # --- Get Collections ---
@@ -33,80 +48,170 @@ shared_invites_collection = db['shared_invites']
 quizzes_collection = db['quizzes']
 
 
-def get_embedding(text, model="text-embedding-3-small"):
-    """Generates a vector embedding for a given text using OpenAI."""
-    try:
-        text = text.replace("\n", " ").strip()
-        if not text:
-            return None
-        return openai.embeddings.create(input=[text], model=model).data[0].embedding
-    except Exception as e:
-        print(f"    ⚠️ Could not generate embedding for text snippet '{text[:30]}...': {e}")
-        return None
+# Same opt-in as app.py: BinData float32 vectors take a quarter of the
+# space of double[] arrays, but need a vectorSearch-type Atlas index.
+STORE_BINARY_VECTORS = os.environ.get('STORE_BINARY_VECTORS', '0') == '1'
+try:
+    from bson.binary import Binary, BinaryVectorDtype
+except ImportError:  # pymongo < 4.10
+    Binary = BinaryVectorDtype = None
+
+
+def pack_embedding(embedding):
+    """Converts an embedding to its storage form (BinData float32 when binary
+    vector storage is enabled and supported, plain list otherwise)."""
+    if embedding and STORE_BINARY_VECTORS and BinaryVectorDtype is not None:
+        return Binary.from_vector(embedding, BinaryVectorDtype.FLOAT32)
+    return embedding
+
+
+# Conservative cap per embeddings request (some deployments limit batches
+# to 16 inputs) and a small pool so big seed sets embed in parallel.
+EMBED_BATCH_SIZE = 16
+EMBED_MAX_WORKERS = 5
+# Fixture texts are identical run-to-run, so embeddings are cached on disk;
+# re-seeding after the first run makes zero OpenAI calls.
+EMBED_CACHE_PATH = '.embed_cache'
+
+
+def _embed_cache_key(model, text):
+    return hashlib.sha256(f"{model}:{text}".encode()).hexdigest()
+
+
+def _embed_chunk(chunk, model):
+    """Embeds one chunk of texts, retrying with jittered backoff on errors
+    (rate limits included). Returns None per slot if the chunk keeps failing."""
+    for attempt in range(3):
+        try:
+            response = _require_openai().embeddings.create(input=chunk, model=model)
+            return [item.embedding for item in response.data]
+        except Exception as e:
+            if attempt == 2:
+                print(f"    ⚠️ Could not generate embeddings for {len(chunk)} snippets: {e}")
+                return [None] * len(chunk)
+            time.sleep((2 ** attempt) + random.uniform(0, 0.5))
+
 
+def _embed_texts(cleaned, model):
+    """Embeds already-cleaned texts: one call for small sets, concurrent
+    EMBED_BATCH_SIZE chunks for larger ones."""
+    chunks = [cleaned[i:i + EMBED_BATCH_SIZE] for i in range(0, len(cleaned), EMBED_BATCH_SIZE)]
+    if len(chunks) == 1:
+        return _embed_chunk(chunks[0], model)
+    embeddings = []
+    with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as pool:
+        # map() yields chunk results in submission order, keeping alignment.
+        for chunk_embeddings in pool.map(lambda chunk: _embed_chunk(chunk, model), chunks):
+            embeddings.extend(chunk_embeddings)
+    return embeddings
 
-def seed_database():
+
+def get_embeddings_batch(texts, model="text-embedding-3-small"):
+    """Generates vector embeddings for a batch of texts.
+
+    Hits the on-disk cache first and only sends cache misses to OpenAI.
+    Returns a list aligned with ``texts``; failed slots are None so seeding
+    can continue without embeddings."""
+    cleaned = [text.replace("\n", " ").strip() for text in texts]
+    if not cleaned:
+        return []
+    embeddings = [None] * len(cleaned)
+    with shelve.open(EMBED_CACHE_PATH) as cache:
+        miss_indexes = []
+        for i, text in enumerate(cleaned):
+            cached = cache.get(_embed_cache_key(model, text))
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                miss_indexes.append(i)
+        if miss_indexes:
+            fresh = _embed_texts([cleaned[i] for i in miss_indexes], model)
+            for i, embedding in zip(miss_indexes, fresh):
+                if embedding is not None:
+                    embeddings[i] = embedding
+                    cache[_embed_cache_key(model, cleaned[i])] = embedding
+    return embeddings
+
+
+def seed_database(with_embeddings=True):
     """
     Clears existing data and populates the database with a rich set of sample users,
     projects, notes (with embeddings), invites, and quizzes for comprehensive testing.
+
+    With ``with_embeddings=False`` the notes are seeded without vectors —
+    useful for non-Atlas setups or when no OpenAI key is available.
     """
+    if with_embeddings and not _require_openai().api_key:
+        print("❌ FATAL: OPENAI_API_KEY environment variable not set. Cannot generate embeddings for seed data.")
+        print("   Re-run with --no-embeddings to seed without vectors.")
+        sys.exit(1)
+
     print("--- 🎬 Starting Database Seeding ---")
 
     # --- 1. Clear Existing Data ---
     print("🧹 Clearing all collections...")
-    collections_to_clear = [
-        users_collection, projects_collection, notes_collection,
-        invited_users_collection, shared_invites_collection, quizzes_collection
-    ]
-    for collection in collections_to_clear:
-        collection.delete_many({})
+    # Dropping is a metadata op (O(1)) versus delete_many's per-document
+    # scan. Regular indexes are recreated automatically when app.py starts.
+    for name in ['users', 'projects', 'invited_users', 'shared_invites', 'quizzes']:
+        db.drop_collection(name)
+    # 'notes' keeps its Atlas Search indexes, which a drop would destroy and
+    # force a minutes-long rebuild — delete its documents instead.
+    notes_collection.delete_many({})
     print("   Collections cleared.")
 
     # --- 2. Create Sample Users ---
+    # Pre-assigning ObjectIds lets each collection load in one bulk_write
+    # instead of a round-trip per document.
     print("👤 Creating sample users...")
-    user1_id = users_collection.insert_one({
-        "email": "sara@example.com",
-        "password": generate_password_hash("password123", method='pbkdf2:sha256')
-    }).inserted_id
-
-    user2_id = users_collection.insert_one({
-        "email": "john@example.com",
-        "password": generate_password_hash("password456", method='pbkdf2:sha256')
-    }).inserted_id
-    
-    user3_id = users_collection.insert_one({
-        "email": "admin@example.com",
-        "password": generate_password_hash("adminpass", method='pbkdf2:sha256')
-    }).inserted_id
+    user1_id, user2_id, user3_id = ObjectId(), ObjectId(), ObjectId()
+    # Throwaway fixture accounts don't need the full 600k PBKDF2 iterations
+    # (~300ms each); check_password_hash reads the cost from the hash itself,
+    # so login still verifies these fine.
+    seed_hash_method = 'pbkdf2:sha256:1000'
+    users_collection.bulk_write([
+        InsertOne({
+            "_id": user1_id, "email": "sara@example.com",
+            "password": generate_password_hash("password123", method=seed_hash_method)
+        }),
+        InsertOne({
+            "_id": user2_id, "email": "john@example.com",
+            "password": generate_password_hash("password456", method=seed_hash_method)
+        }),
+        InsertOne({
+            "_id": user3_id, "email": "admin@example.com",
+            "password": generate_password_hash("adminpass", method=seed_hash_method)
+        }),
+    ], ordered=False, bypass_document_validation=True)
     print(f"   Created 3 users: Sara (ID: {user1_id}), John (ID: {user2_id}), Admin (ID: {user3_id})")
 
     # --- 3. Create Sample Projects ---
     print("📚 Creating sample projects...")
     now = datetime.datetime.utcnow()
 
-    sara_project1_id = projects_collection.insert_one({
-        "user_id": user1_id, "name": "Grandma's Biography",
-        "project_goal": "To collect memories and stories about Grandma Helen's life for her 90th birthday.",
-        "project_type": "story", "created_at": now - datetime.timedelta(days=10)
-    }).inserted_id
-
-    sara_project2_id = projects_collection.insert_one({
-        "user_id": user1_id, "name": "Biology 101 Midterm Prep",
-        "project_goal": "To master key concepts for the upcoming biology midterm, focusing on cellular processes.",
-        "project_type": "study", "created_at": now - datetime.timedelta(days=5)
-    }).inserted_id
-
-    john_project1_id = projects_collection.insert_one({
-        "user_id": user2_id, "name": "Sci-Fi Novel: 'The Last Signal'",
-        "project_goal": "World-building notes, character backstories, and plot outlines for my new science fiction novel.",
-        "project_type": "story", "created_at": now - datetime.timedelta(days=20)
-    }).inserted_id
-
-    admin_project1_id = projects_collection.insert_one({
-        "user_id": user3_id, "name": "Company History Archives",
-        "project_goal": "A central repository for key milestones and historical documents of the company.",
-        "project_type": "story", "created_at": now - datetime.timedelta(days=60)
-    }).inserted_id
+    sara_project1_id, sara_project2_id = ObjectId(), ObjectId()
+    john_project1_id, admin_project1_id = ObjectId(), ObjectId()
+    projects_collection.bulk_write([
+        InsertOne({
+            "_id": sara_project1_id, "user_id": user1_id, "name": "Grandma's Biography",
+            "project_goal": "To collect memories and stories about Grandma Helen's life for her 90th birthday.",
+            "project_type": "story", "created_at": now - datetime.timedelta(days=10)
+        }),
+        InsertOne({
+            "_id": sara_project2_id, "user_id": user1_id, "name": "Biology 101 Midterm Prep",
+            "project_goal": "To master key concepts for the upcoming biology midterm, focusing on cellular processes.",
+            "project_type": "study", "created_at": now - datetime.timedelta(days=5)
+        }),
+        InsertOne({
+            "_id": john_project1_id, "user_id": user2_id, "name": "Sci-Fi Novel: 'The Last Signal'",
+            "project_goal": "World-building notes, character backstories, and plot outlines for my new science fiction novel.",
+            "project_type": "story", "created_at": now - datetime.timedelta(days=20)
+        }),
+        InsertOne({
+            "_id": admin_project1_id, "user_id": user3_id, "name": "Company History Archives",
+            "project_goal": "A central repository for key milestones and historical documents of the company.",
+            "project_type": "story", "created_at": now - datetime.timedelta(days=60)
+        }),
+    ], ordered=False, bypass_document_validation=True)
     print("   Created 4 projects.")
 
     # --- 4. Create Sample Notes (with embeddings) ---
@@ -147,27 +252,46 @@ def seed_database():
     ]
     all_notes_to_insert.extend(john_scifi_notes)
 
-    # Generate embeddings for all notes
-    for note in all_notes_to_insert:
-        note['content_embedding'] = get_embedding(note['content'])
-        time.sleep(0.1) # Small delay to avoid hitting API rate limits
+    # Kick off embedding in the background so the OpenAI round-trip overlaps
+    # with the note insert; the vectors are backfilled in one bulk update,
+    # mirroring the app's insert-then-backfill pattern.
+    embed_future = None
+    if with_embeddings:
+        embed_pool = ThreadPoolExecutor(max_workers=1)
+        embed_future = embed_pool.submit(
+            get_embeddings_batch, [note['content'] for note in all_notes_to_insert])
 
     if all_notes_to_insert:
-        notes_collection.insert_many(all_notes_to_insert)
-    
+        notes_collection.insert_many(all_notes_to_insert, ordered=False,
+                                     bypass_document_validation=True)
+
+    if embed_future is not None:
+        embeddings = embed_future.result()
+        embed_pool.shutdown()
+        vector_updates = [
+            UpdateOne({'_id': note['_id']}, {'$set': {'content_embedding': pack_embedding(embedding)}})
+            for note, embedding in zip(all_notes_to_insert, embeddings)
+            if embedding is not None
+        ]
+        if vector_updates:
+            notes_collection.bulk_write(vector_updates, ordered=False,
+                                        bypass_document_validation=True)
+
     # Get IDs of biology notes for quiz linking
     biology_note_ids = [note['_id'] for note in biology_notes]
-    print(f"   Created {len(all_notes_to_insert)} notes with embeddings.")
+    print(f"   Created {len(all_notes_to_insert)} notes"
+          f"{' with embeddings' if with_embeddings else ''}.")
 
     # --- 5. Create Sample Invites ---
     print("💌 Creating sample invites...")
+    invite_token = uuid.uuid4().hex
     invited_users_collection.insert_one({
-        "token": str(uuid.uuid4()), "label": "Uncle Bob",
+        "_id": invite_token, "token": invite_token, "label": "Uncle Bob",
         "project_id": sara_project1_id, "prompt": "What's your favorite memory of mom's baking?",
         "created_at": now - datetime.timedelta(days=9)
     })
     shared_invites_collection.insert_one({
-        "token": str(uuid.uuid4()), "project_id": john_project1_id,
+        "token": uuid.uuid4().hex, "project_id": john_project1_id,
         "user_id": user2_id, "prompt": "I'm looking for cool sci-fi ideas for my new book! What's a unique concept for a planet or alien species you can think of?",
         "created_at": now - datetime.timedelta(days=2)
     })
@@ -177,7 +301,7 @@ def seed_database():
     print("🧠 Creating sample quizzes...")
     quizzes_collection.insert_one({
         "user_id": user1_id, "project_id": sara_project2_id, "title": "Cellular Organelles Quiz (MC)",
-        "question_type": "Multiple Choice", "created_at": now - datetime.timedelta(days=2), "share_token": str(uuid.uuid4()),
+        "question_type": "Multiple Choice", "created_at": now - datetime.timedelta(days=2), "share_token": uuid.uuid4().hex,
         "quiz_data": [
             {"question": "Which organelle is known as the 'powerhouse of the cell'?", "options": ["Ribosome", "Nucleus", "Mitochondria", "Golgi Apparatus"], "correct_answer_index": 2},
             {"question": "What is the primary function of a Ribosome?", "options": ["Energy production", "Protein synthesis", "Waste disposal", "Cellular transport"], "correct_answer_index": 1}
@@ -186,7 +310,7 @@ def seed_database():
     })
     quizzes_collection.insert_one({
         "user_id": user1_id, "project_id": sara_project2_id, "title": "Key Biology Concepts (T/F)",
-        "question_type": "True/False", "created_at": now - datetime.timedelta(days=1), "share_token": str(uuid.uuid4()),
+        "question_type": "True/False", "created_at": now - datetime.timedelta(days=1), "share_token": uuid.uuid4().hex,
         "quiz_data": [
             {"question": "Photosynthesis converts chemical energy into light energy.", "answer": False},
             {"question": "ATP is the main energy currency of the cell.", "answer": True}
@@ -206,4 +330,9 @@ def seed_database():
 
 
 if __name__ == '__main__':
-    seed_database()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Seed the story_weaver_auth database with sample data.")
+    parser.add_argument('--no-embeddings', action='store_true',
+                        help="Skip OpenAI embedding generation (for non-Atlas setups or missing API keys).")
+    args = parser.parse_args()
+    seed_database(with_embeddings=not args.no_embeddings)
\ No newline at end of file
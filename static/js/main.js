@@ -36,7 +36,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const isInviteView = !!document.getElementById('invite-note-form') && !!config.inviteToken;
 
     let projectViewState = {
-        currentPage: 1,
+        nextCursor: null,
         isLoading: false,
         hasMorePages: true,
         searchDebounceTimer: null,
@@ -52,7 +52,10 @@ document.addEventListener('DOMContentLoaded', () => {
             selectedTags: [],
             currentPage: 1,
             totalPages: 1,
-            searchType: 'vector'
+            searchType: 'vector',
+            // page number -> Atlas Search resume token for that page, so
+            // Prev/Next avoid server-side skip scans on deep pages.
+            pageTokens: {}
         },
         webSearchContext: {
             url: '',
@@ -131,8 +134,7 @@ document.addEventListener('DOMContentLoaded', () => {
         document.getElementById('deselect-all-notes-btn')?.addEventListener('click', handleDeselectAllNotes);
 
         // --- Initial Data Load & Infinite Scroll ---
-        populateContributors();
-        fetchNotes();
+        bootstrapProjectView();
         window.addEventListener('scroll', handleInfiniteScroll);
     }
 
@@ -178,7 +180,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const loadingIndicator = document.getElementById('loading-indicator');
 
         if (isNewFilter) {
-            projectViewState.currentPage = 1;
+            projectViewState.nextCursor = null;
             projectViewState.hasMorePages = true;
             if (notesContainer) notesContainer.innerHTML = '';
         }
@@ -186,16 +188,21 @@ document.addEventListener('DOMContentLoaded', () => {
 
         try {
             const contributorFilter = document.getElementById('contributor-filter').value;
-            const response = await fetch(`/api/notes/${config.projectId}?page=${projectViewState.currentPage}&contributor_filter=${contributorFilter}`);
+            let notesUrl = `/api/notes/${config.projectId}?contributor_filter=${contributorFilter}`;
+            if (projectViewState.nextCursor) {
+                notesUrl += `&after=${encodeURIComponent(projectViewState.nextCursor)}`;
+            }
+            const response = await fetch(notesUrl);
             if (!response.ok) throw new Error('Failed to fetch notes');
-            const newNotes = await response.json();
+            const data = await response.json();
+            const newNotes = data.notes;
+            const isFirstPage = !projectViewState.nextCursor;
 
-            if (newNotes.length > 0) {
-                newNotes.forEach(note => renderNote(note));
-                projectViewState.currentPage++;
-            } else {
+            newNotes.forEach(note => renderNote(note));
+            projectViewState.nextCursor = data.next_cursor;
+            if (!data.next_cursor) {
                 projectViewState.hasMorePages = false;
-                if (projectViewState.currentPage === 1 && notesContainer?.innerHTML === '') {
+                if (isFirstPage && newNotes.length === 0 && notesContainer?.innerHTML === '') {
                     notesContainer.innerHTML = `<p class="no-notes-message text-slate-500 text-center col-span-full py-8">No notes found for this filter.</p>`;
                 }
             }
@@ -208,9 +215,10 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     async function fetchAndRenderPreviewNotes() {
-        const { searchQuery, selectedTags, currentPage, searchType } = modalState.previewState;
+        const { searchQuery, selectedTags, currentPage, searchType, pageTokens } = modalState.previewState;
         const params = new URLSearchParams({ page: currentPage, q: searchQuery, tags: selectedTags.join(',') });
         if (config.isAtlas) params.append('search_type', searchType);
+        if (pageTokens[currentPage]) params.append('search_after', pageTokens[currentPage]);
 
         const previewNotesContainer = document.getElementById('preview-notes-container');
         previewNotesContainer.innerHTML = '<div class="spinner mx-auto my-4"></div>';
@@ -218,6 +226,9 @@ document.addEventListener('DOMContentLoaded', () => {
         try {
             const data = await apiFetch(`/api/search-notes/${config.projectId}?${params.toString()}`);
             modalState.previewState.totalPages = data.total_pages;
+            if (data.next_search_after) {
+                modalState.previewState.pageTokens[currentPage + 1] = data.next_search_after;
+            }
 
             previewNotesContainer.innerHTML = '';
             if (data.notes.length === 0) {
@@ -473,19 +484,49 @@ document.addEventListener('DOMContentLoaded', () => {
         setButtonLoading(confirmBtn, 'Weaving...');
 
         try {
-            const data = await apiFetch('/api/generate-story', {
+            const response = await fetch('/api/generate-story', {
                 method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     project_name: config.projectName,
                     tone: selectedTone,
                     format: selectedFormat,
-                    notes: modalState.selectedNotes
+                    notes: modalState.selectedNotes,
+                    stream: true
                 })
             });
+            if (!response.ok) {
+                const err = await response.json().catch(() => ({}));
+                throw new Error(err.error || 'Failed to generate story.');
+            }
             document.getElementById('note-selection-modal').classList.add('hidden');
             document.getElementById('story-modal-title').textContent = `Your Story: ${config.projectName}`;
-            document.getElementById('story-modal-content').innerHTML = `<div class="prose max-w-none">${sanitizeHTML(data.story).replace(/\n/g, '<br>')}</div>`;
+            const contentEl = document.getElementById('story-modal-content');
+            contentEl.innerHTML = '<div class="prose max-w-none"></div>';
+            const proseEl = contentEl.firstElementChild;
             document.getElementById('story-modal').classList.remove('hidden');
+
+            // Render SSE deltas as they arrive so the story appears progressively.
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let story = '';
+            let buffer = '';
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split('\n\n');
+                buffer = events.pop();
+                for (const event of events) {
+                    if (!event.startsWith('data: ')) continue;
+                    const payload = event.slice(6);
+                    if (payload === '[DONE]') continue;
+                    const parsed = JSON.parse(payload);
+                    if (parsed.error) throw new Error(parsed.error);
+                    story += parsed.delta || '';
+                    proseEl.innerHTML = sanitizeHTML(story).replace(/\n/g, '<br>');
+                }
+            }
         } catch (error) {
             showToast(error.message, 'error');
         } finally {
@@ -645,6 +686,7 @@ document.addEventListener('DOMContentLoaded', () => {
         projectViewState.searchDebounceTimer = setTimeout(() => {
             modalState.previewState.searchQuery = e.target.value;
             modalState.previewState.currentPage = 1;
+            modalState.previewState.pageTokens = {};
             fetchAndRenderPreviewNotes();
         }, 400);
     }
@@ -652,6 +694,7 @@ document.addEventListener('DOMContentLoaded', () => {
     function handlePreviewTagFilterChange() {
         modalState.previewState.selectedTags = Array.from(document.querySelectorAll('#preview-tags-container .tag-checkbox:checked')).map(cb => cb.value);
         modalState.previewState.currentPage = 1;
+        modalState.previewState.pageTokens = {};
         fetchAndRenderPreviewNotes();
     }
 
@@ -666,6 +709,7 @@ document.addEventListener('DOMContentLoaded', () => {
     function handlePreviewSearchTypeChange(e) {
         modalState.previewState.searchType = e.target.value;
         modalState.previewState.currentPage = 1;
+        modalState.previewState.pageTokens = {};
         fetchAndRenderPreviewNotes();
     }
 
@@ -1185,7 +1229,8 @@ document.addEventListener('DOMContentLoaded', () => {
             selectedTags: [],
             currentPage: 1,
             totalPages: 1,
-            searchType: 'vector'
+            searchType: 'vector',
+            pageTokens: {}
         };
 
         document.getElementById('note-selection-title').textContent = title;
@@ -1199,14 +1244,30 @@ document.addEventListener('DOMContentLoaded', () => {
         document.getElementById('note-selection-modal').classList.remove('hidden');
     }
 
-    async function populateContributors() {
-        const filterEl = document.getElementById('contributor-filter');
-        if (!filterEl) return;
+    async function bootstrapProjectView() {
+        // Loads the first page of notes plus the contributor filter in a
+        // single request instead of separate XHRs on page load.
+        const notesContainer = document.getElementById('notes-container');
+        const loadingIndicator = document.getElementById('loading-indicator');
+        projectViewState.isLoading = true;
+        loadingIndicator?.classList.remove('hidden');
         try {
-            const contributors = await apiFetch(`/api/contributors/${config.projectId}`);
-            filterEl.innerHTML = contributors.map(c => `<option value="${c}">${c}</option>`).join('');
+            const data = await apiFetch(`/api/project-bootstrap/${config.projectId}`);
+            const filterEl = document.getElementById('contributor-filter');
+            if (filterEl) {
+                filterEl.innerHTML = data.contributors.map(c => `<option value="${c}">${c}</option>`).join('');
+            }
+            data.notes.forEach(note => renderNote(note));
+            projectViewState.nextCursor = data.next_cursor;
+            projectViewState.hasMorePages = !!data.next_cursor;
+            if (data.notes.length === 0 && notesContainer) {
+                notesContainer.innerHTML = `<p class="no-notes-message text-slate-500 text-center col-span-full py-8">No notes found for this filter.</p>`;
+            }
         } catch (error) {
-            console.error('Failed to populate contributors:', error);
+            showToast(error.message, 'error');
+        } finally {
+            projectViewState.isLoading = false;
+            loadingIndicator?.classList.add('hidden');
         }
     }
 